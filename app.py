@@ -35,6 +35,7 @@ def main():
         """
         - 📊 **Analytics** page shows your rating distribution, my-vs-global comparison, favorite genres & actors.  
         - 🎯 **Recommendations** page suggests new dramas you haven't watched yet, ranked by how well they match your taste.  
+        - 🔍 **Search** page finds a drama by title (typos are fine) and adds it to your ratings.  
         - This is **Iteration A**: a pure analytics & rules-based app. Later iterations will add Gen-AI explanations.
         """
     )
@@ -0,0 +1,111 @@
+# benchmarks/import_time.py
+"""
+Cold-start import benchmark for the utils modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+and its median time on top of a bare `import pandas` from the same runs is
+reported with the spread between runs.
+
+Milliseconds are too noisy to gate on, so the gate counts modules
+instead, which is deterministic. Importing a module must stay within its
+budget of modules loaded on top of pandas, and must not load any
+third-party package beyond what pandas loads: a new dependency, heavy or
+not, has to be deferred to the code path that needs it. Exits non-zero
+if either check fails, so it can gate CI:
+
+    python benchmarks/import_time.py [--runs 7]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BASELINE = "pandas"
+
+# module -> budget of modules its import may load on top of the baseline
+# (measured: text 2, helpers 4, loader 8, recommender 9, service 39)
+MODULE_BUDGETS = {
+    "utils.text": 10,
+    "utils.helpers": 15,
+    "utils.loader": 25,
+    "utils.recommender": 25,
+    "utils.service": 60,
+}
+
+# only imported when the code path that needs them runs (named in failures)
+DEFERRED = ["rapidfuzz", "scipy", "altair", "PIL", "streamlit", "aiohttp"]
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of `module` in ms, and the names of all modules it loaded."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+    cumulative_us = 0
+    loaded = set()
+    for match in _LINE.finditer(proc.stderr):
+        _, cumulative, _, name = match.groups()
+        loaded.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000.0, loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    modules = [BASELINE, *MODULE_BUDGETS]
+    for module in modules:
+        # warm the bytecode cache
+        measure(module)
+
+    # interleave the modules so machine noise hits all of them alike
+    times = {module: [] for module in modules}
+    loaded = {}
+    for _ in range(args.runs):
+        for module in modules:
+            ms, loaded[module] = measure(module)
+            times[module].append(ms)
+
+    median = {module: statistics.median(ms) for module, ms in times.items()}
+    baseline = median[BASELINE]
+    print(f"baseline: import {BASELINE} {baseline:.1f} ms (median of {args.runs}), {len(loaded[BASELINE])} modules")
+
+    failures = []
+    print(f"{'module':<20} {'median ms':>10} {'+baseline':>10} {'spread ms':>10} {'+modules':>9} {'budget':>7}")
+    for module, budget in MODULE_BUDGETS.items():
+        # modules that don't import pandas are measured on their own
+        extra = median[module] - baseline if BASELINE in loaded[module] else median[module]
+        spread = max(times[module]) - min(times[module])
+        added = loaded[module] - loaded[BASELINE]
+        print(f"{module:<20} {median[module]:>10.1f} {extra:>10.1f} {spread:>10.1f} {len(added):>9} {budget:>7}")
+
+        if len(added) > budget:
+            failures.append(f"{module}: loads {len(added)} modules on top of {BASELINE} > {budget} budget")
+        packages = {name.split(".")[0] for name in added}
+        third_party = sorted(p for p in packages if p not in sys.stdlib_module_names and p != "utils")
+        leaked = sorted(set(DEFERRED) & packages)
+        if leaked:
+            failures.append(f"{module}: imports deferred dependencies {', '.join(leaked)}")
+        elif third_party:
+            failures.append(f"{module}: imports third-party packages {', '.join(third_party)} (defer them)")
+
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
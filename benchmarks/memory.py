@@ -0,0 +1,134 @@
+# benchmarks/memory.py
+"""
+Memory footprint of one app session: the catalog, the recommendation
+engine, the prepared user data and the candidate table.
+
+Sizes are deep (strings included) and shared objects are counted once,
+so the engine's catalog frame is not counted twice. For comparison the
+catalog is also measured in the old representation: object-dtype text,
+float64 / int64 numbers and a Python list per row for genres, cast and
+tags. The tracemalloc peak covers a cold run of the whole pipeline.
+
+    python benchmarks/memory.py [--kaggle data/kdrama_kaggle_1500.csv] [--ratings ...]
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.loader import (  # noqa: E402
+    _build_title_index,
+    _clean_catalog,
+    default_data_paths,
+    prepare_user_data,
+)
+from utils.recommender import (  # noqa: E402
+    _get_favorite_genres_and_actors,
+    build_engine,
+    score_candidates,
+)
+
+MB = 1024 * 1024
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes held by frames, arrays and sparse matrices inside `obj`, each counted once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + (sum(sys.getsizeof(x) for x in obj) if obj.dtype == object else 0)
+    if hasattr(obj, "indptr"):  # scipy sparse
+        return obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes
+    if isinstance(obj, dict):
+        return sum(deep_size(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(deep_size(v, seen) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _split_list(series: pd.Series) -> pd.Series:
+    """Comma separated strings ("Action, Drama") as lists, as the old catalog held them."""
+    return (
+        series
+        .fillna("")
+        .str.split(",")
+        .apply(lambda lst: [x.strip() for x in lst if x.strip() != ""])
+    )
+
+
+def legacy_catalog(kdrama: pd.DataFrame) -> pd.DataFrame:
+    """The catalog as it used to be held: object text, wide numbers, list columns."""
+    legacy = kdrama.astype(
+        {
+            **{c: object for c in kdrama.columns},
+            "year": "float64",
+            "global_score": "float64",
+            "episodes": "Int64",
+        }
+    )
+    return legacy.assign(
+        genre_list=_split_list(legacy["genre"]),
+        actor_list=_split_list(legacy["cast"]),
+        tag_list=_split_list(legacy["tags"]),
+    )
+
+
+def run_session(kaggle_path: Path, ratings_path: Path) -> dict:
+    """The app's pipeline without the disk cache; returns everything a session keeps."""
+    kdrama = _clean_catalog(pd.read_csv(kaggle_path))
+    catalog = {"key": None, "kdrama": kdrama, "title_index": _build_title_index(kdrama["title_clean"].tolist())}
+    data = prepare_user_data(catalog, pd.read_csv(ratings_path))
+    engine = build_engine(catalog)
+
+    genres, actors = _get_favorite_genres_and_actors(data["genre_stats"], data["actor_stats"])
+    watched = data["my_ratings"]["title_clean_matched"].dropna().unique()
+    candidates = score_candidates(engine, watched, genres, actors)
+    return {"catalog": catalog, "engine": engine, "data": data, "candidates": candidates}
+
+
+def main(argv=None) -> int:
+    default_kaggle, default_ratings = default_data_paths()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--kaggle", type=Path, default=default_kaggle)
+    parser.add_argument("--ratings", type=Path, default=default_ratings)
+    args = parser.parse_args(argv)
+
+    tracemalloc.start()
+    session = run_session(args.kaggle, args.ratings)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seen = set()
+    print(f"{'component':<12} {'MB':>8}")
+    total = 0
+    for name in ("catalog", "engine", "data", "candidates"):
+        size = deep_size(session[name], seen)
+        total += size
+        print(f"{name:<12} {size / MB:>8.2f}")
+    print(f"{'session':<12} {total / MB:>8.2f}")
+    print(f"{'peak':<12} {peak / MB:>8.2f}  (tracemalloc, cold pipeline)")
+
+    kdrama = session["catalog"]["kdrama"]
+    compact = deep_size(kdrama)
+    legacy = deep_size(legacy_catalog(kdrama))
+    print(f"\ncatalog frame: {compact / MB:.2f} MB, old representation {legacy / MB:.2f} MB "
+          f"({legacy / max(compact, 1):.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
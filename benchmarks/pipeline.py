@@ -0,0 +1,204 @@
+# benchmarks/pipeline.py
+"""
+Stage-by-stage benchmark of the data pipeline on synthetic catalogs
+(see benchmarks/synthetic.py): parsing and cleaning the catalog, title
+matching, the user stage, the recommendation engine, scoring, the top-N
+render path, re-ranking with other weights and the poster lookup.
+
+Every stage is timed on its own (best of --runs) and then run once more
+under tracemalloc for its peak Python allocation. pyarrow's own memory
+pool is not traced. Results are written to benchmarks/results/<label>.json
+(the label defaults to the current commit). --compare reports the change
+against an earlier result file and exits non-zero on a regression.
+
+    python benchmarks/pipeline.py --sizes 1000 10000 100000
+    python benchmarks/pipeline.py --compare 773a2f2
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from synthetic import BENCH_DATA_DIR, dataset  # noqa: E402
+from utils import helpers  # noqa: E402
+from utils.loader import _build_title_index, _clean_catalog, _match_titles, prepare_user_data  # noqa: E402
+from utils.recommender import (  # noqa: E402
+    _get_favorite_genres_and_actors,
+    build_engine,
+    score_candidates,
+    top_recommendations,
+)
+from utils.text import _normalize_titles  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+MAX_POSTERS = 20_000
+RERANK_WEIGHTS = {"global": 0.2, "genre": 0.5, "actor": 0.3}  # a slider change on the Recommendations page
+DIVERSITY = 0.5  # the Variety slider
+
+
+def _catalog(state: dict) -> dict:
+    kdrama = state["kdrama"]
+    return {"key": None, "kdrama": kdrama, "title_index": state["title_index"]}
+
+
+def _favorites(state: dict) -> tuple:
+    return _get_favorite_genres_and_actors(state["user"]["genre_stats"], state["user"]["actor_stats"])
+
+
+def _score(state: dict) -> pd.DataFrame:
+    genres, actors = _favorites(state)
+    watched = state["user"]["my_ratings"]["title_clean_matched"].dropna().unique()
+    return score_candidates(state["engine"], watched, genres, actors)
+
+
+def _posters(state: dict) -> list:
+    helpers._poster_indexes.clear()  # include building the index
+    return helpers.find_local_posters(state["ratings"]["title"], state["poster_dir"])
+
+
+# (stage, function of the state so far, state key for its result), in pipeline order
+STAGES = [
+    ("read_csv", lambda s: pd.read_csv(s["catalog_path"]), "raw"),
+    ("clean_catalog", lambda s: _clean_catalog(s["raw"]), "kdrama"),
+    ("title_index", lambda s: _build_title_index(s["kdrama"]["title_clean"].tolist()), "title_index"),
+    ("match_titles", lambda s: _match_titles(_normalize_titles(s["ratings"]["title"]), s["title_index"]), None),
+    ("prepare_user_data", lambda s: prepare_user_data(_catalog(s), s["ratings"].copy()), "user"),
+    ("build_engine", lambda s: build_engine(_catalog(s)), "engine"),
+    ("score", _score, "candidates"),
+    ("top_n", lambda s: top_recommendations(s["candidates"], 30, *_favorites(s)), None),
+    ("rerank", lambda s: top_recommendations(s["candidates"], 30, *_favorites(s), weights=RERANK_WEIGHTS), None),
+    (
+        "diversify",
+        lambda s: top_recommendations(s["candidates"], 30, *_favorites(s), diversity=DIVERSITY, engine=s["engine"]),
+        None,
+    ),
+    ("posters", _posters, None),
+]
+
+
+def poster_dir(titles: pd.Series, rows: int) -> Path:
+    """A directory of empty poster files for (up to MAX_POSTERS of) the catalog titles."""
+    directory = BENCH_DATA_DIR / f"posters-{rows}"
+    if not directory.is_dir():
+        tmp = directory.with_suffix(".tmp")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for title in titles.dropna().astype(str).head(MAX_POSTERS):
+            (tmp / f"{title.replace('/', ' ')}.jpg").touch()
+        tmp.replace(directory)
+    return directory
+
+
+def run_size(rows: int, ratings_rows: int, runs: int, memory: bool) -> dict:
+    catalog_path, ratings_path = dataset(rows, ratings_rows)
+    state = {"catalog_path": catalog_path, "ratings": pd.read_csv(ratings_path)}
+    state["poster_dir"] = poster_dir(pd.read_csv(catalog_path, usecols=["Name"])["Name"], rows)
+
+    results = {}
+    for stage, fn, key in STAGES:
+        best = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = fn(state)
+            best = min(best, time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            fn(state)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+        if key is not None:
+            state[key] = out
+        results[stage] = {"seconds": round(best, 6), "peak_mb": None if peak is None else round(peak, 2)}
+        mem = "" if peak is None else f" {peak:>9.1f}"
+        print(f"{rows:>9} {stage:<18} {best:>9.4f}{mem}", flush=True)
+    return results
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def current_label() -> str:
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    dirty = _git("status", "--porcelain", "--untracked-files=no")
+    return f"{commit}-dirty" if dirty else commit
+
+
+def compare(old: dict, new: dict, threshold: float, min_seconds: float = 0.005) -> list[str]:
+    """Print old vs new times; return the regressions (slower by more than `threshold` x)."""
+    regressions = []
+    print(f"\n{'rows':>9} {'stage':<18} {'old s':>9} {'new s':>9} {'ratio':>7}")
+    for size, stages in new["results"].items():
+        for stage, result in stages.items():
+            before = old["results"].get(size, {}).get(stage)
+            if before is None:
+                continue
+            ratio = result["seconds"] / max(before["seconds"], 1e-9)
+            flag = ""
+            if ratio > threshold and result["seconds"] - before["seconds"] > min_seconds:
+                flag = "  REGRESSION"
+                regressions.append(f"{size} {stage}: {before['seconds']:.4f}s -> {result['seconds']:.4f}s")
+            print(f"{size:>9} {stage:<18} {before['seconds']:>9.4f} {result['seconds']:>9.4f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ratings", type=int, default=None, help="rating rows (default size // 10, at most 5000)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--label", default=None, help="result file name (default: current commit)")
+    parser.add_argument("--compare", default=None, help="label or path of an earlier result file")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>9} {'stage':<18} {'best s':>9}" + ("" if args.no_memory else f" {'peak MB':>9}"))
+    results = {}
+    for rows in args.sizes:
+        ratings_rows = args.ratings or min(max(rows // 10, 1), 5000)
+        results[str(rows)] = run_size(rows, ratings_rows, args.runs, not args.no_memory)
+
+    label = args.label or current_label()
+    report = {
+        "label": label,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    out = RESULTS_DIR / f"{label}.json"
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nresults -> {out}")
+
+    if args.compare:
+        path = Path(args.compare)
+        if not path.exists():
+            path = RESULTS_DIR / f"{args.compare}.json"
+        regressions = compare(json.loads(path.read_text()), report, args.threshold)
+        for line in regressions:
+            print("FAIL", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
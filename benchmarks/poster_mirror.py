@@ -0,0 +1,132 @@
+# benchmarks/poster_mirror.py
+"""
+Poster mirror against a local stand-in for the poster host: a threaded
+HTTP/1.1 server (keep-alive) that answers every request after a fixed
+latency with a small JPEG, or with a 404 / an HTML page / a reset
+connection for a share of the URLs. Several URLs serve the same image.
+
+Mirrors the same URLs serially and with --concurrency requests in flight
+(fresh mirror directories), reports posters per second and checks the
+result: every good URL stored, every bad one recorded as broken, one
+file per distinct image, and a second run fetching nothing.
+
+    python benchmarks/poster_mirror.py [--urls 300] [--latency 0.05]
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.posters import MANIFEST, mirror_posters  # noqa: E402
+
+DISTINCT_IMAGES = 50
+
+
+def _images() -> list[bytes]:
+    from PIL import Image
+
+    images = []
+    for i in range(DISTINCT_IMAGES):
+        buf = io.BytesIO()
+        Image.new("RGB", (60, 90), ((i * 37) % 256, (i * 91) % 256, (i * 53) % 256)).save(buf, format="JPEG")
+        images.append(buf.getvalue())
+    return images
+
+
+def _kind(i: int) -> str:
+    """What the stand-in serves for poster i."""
+    if i % 17 == 5:
+        return "404"
+    if i % 23 == 7:
+        return "html"
+    if i % 29 == 11:
+        return "reset"
+    return "image"
+
+
+def serve(latency: float) -> tuple:
+    """Start the stand-in server in a thread; returns (server, base URL)."""
+    images = _images()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the client can reuse connections
+
+        def do_GET(self):
+            time.sleep(latency)
+            i = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+            kind = _kind(i)
+            if kind == "reset":
+                self.close_connection = True
+                self.connection.close()
+                return
+            if kind == "image":
+                status, ctype, body = 200, "image/jpeg", images[i % DISTINCT_IMAGES]
+            elif kind == "html":
+                status, ctype, body = 200, "text/html", b"<html>moved</html>"
+            else:
+                status, ctype, body = 404, "text/plain", b"not found"
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    server, base = serve(args.latency)
+    urls = [f"{base}/poster/{i}.jpg" for i in range(args.urls)]
+    good = sum(_kind(i) == "image" for i in range(args.urls))
+    distinct = len({i % DISTINCT_IMAGES for i in range(args.urls) if _kind(i) == "image"})
+
+    print(f"{args.urls} URLs ({good} images), {args.latency * 1000:.0f} ms latency")
+    print(f"{'concurrency':<12} {'seconds':>8} {'posters/s':>10}")
+    failures = []
+    timings = {}
+    for concurrency in (1, args.concurrency):
+        with tempfile.TemporaryDirectory() as tmp:
+            mirror_dir = Path(tmp)
+            start = time.perf_counter()
+            counts = mirror_posters(urls, mirror_dir, concurrency=concurrency, timeout=10)
+            timings[concurrency] = time.perf_counter() - start
+            print(f"{concurrency:<12} {timings[concurrency]:>8.2f} {args.urls / timings[concurrency]:>10.1f}")
+
+            stored = [p for p in mirror_dir.iterdir() if p.name != MANIFEST]
+            again = mirror_posters(urls, mirror_dir, concurrency=concurrency)
+            if counts["fetched"] != good or counts["broken"] != args.urls - good:
+                failures.append(f"concurrency {concurrency}: {counts}")
+            if len(stored) != distinct:
+                failures.append(f"concurrency {concurrency}: {len(stored)} files for {distinct} distinct images")
+            if again["fetched"] or again["broken"]:
+                failures.append(f"concurrency {concurrency}: second run fetched again {again}")
+
+    server.shutdown()
+    print(f"speedup {timings[1] / timings[args.concurrency]:.1f}x")
+    for line in failures:
+        print("FAIL", line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
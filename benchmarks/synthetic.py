@@ -0,0 +1,161 @@
+# benchmarks/synthetic.py
+"""
+Synthetic data for the benchmarks: Kaggle-format catalogs and personal
+rating files of any size, drawn from the vocabularies of the bundled
+catalog (title words, genres, cast, tags, networks, synopsis words).
+
+Rating titles carry the kind of noise real files have: case changes,
+dropped punctuation, an added or missing "The", typos, trailing spaces,
+and a share of titles that are not in the catalog at all.
+
+    python benchmarks/synthetic.py 100000 --out /tmp/bench
+"""
+
+import argparse
+import random
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.cache import CACHE_DIR  # noqa: E402
+from utils.loader import default_data_paths  # noqa: E402
+
+BENCH_DATA_DIR = CACHE_DIR / "bench"
+
+
+def _vocab(values: pd.Series, sep: str = ",") -> np.ndarray:
+    items = values.dropna().astype(str).str.split(sep).explode().str.strip()
+    return items[items != ""].unique()
+
+
+def _source_vocabularies() -> dict:
+    source = pd.read_csv(default_data_paths()[0])
+    words = source["Sinopsis"].dropna().str.findall(r"[A-Za-z']+").explode()
+    return {
+        "title_words": _vocab(source["Name"], sep=" "),
+        "genres": _vocab(source["Genre"]),
+        "cast": _vocab(source["Main Cast"]),
+        "tags": _vocab(source["Tags"]),
+        "networks": _vocab(source["Network"]),
+        "content_ratings": source["Content Rating"].dropna().unique(),
+        "episodes": source["Episode"].dropna().unique(),
+        "scores": source["Score"].dropna().to_numpy(),
+        "synopsis_words": words.dropna().unique(),
+    }
+
+
+def _joined(rng, vocab: np.ndarray, rows: int, lo: int, hi: int, sep: str) -> list[str]:
+    """`rows` strings of lo..hi vocabulary items joined by `sep`."""
+    counts = rng.integers(lo, hi + 1, rows)
+    flat = vocab[rng.integers(0, len(vocab), counts.sum())]
+    return [sep.join(items) for items in np.split(flat, np.cumsum(counts)[:-1])]
+
+
+def make_catalog(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A raw catalog with the Kaggle CSV's columns; titles are unique."""
+    rng = np.random.default_rng(seed)
+    vocab = _source_vocabularies()
+
+    titles = pd.Series(_joined(rng, vocab["title_words"], rows, 1, 4, " "))
+    repeat = titles.groupby(titles).cumcount()
+    titles = titles.where(repeat == 0, titles + " " + (repeat + 1).astype(str))
+
+    return pd.DataFrame(
+        {
+            "Name": titles,
+            "Year": rng.integers(2000, 2025, rows),
+            "Genre": _joined(rng, vocab["genres"], rows, 1, 4, ", "),
+            "Main Cast": _joined(rng, vocab["cast"], rows, 2, 6, ", "),
+            "Sinopsis": _joined(rng, vocab["synopsis_words"], rows, 20, 80, " "),
+            "Score": rng.choice(vocab["scores"], rows),
+            "Content Rating": rng.choice(vocab["content_ratings"], rows),
+            "Tags": _joined(rng, vocab["tags"], rows, 3, 8, ",, "),
+            "Network": _joined(rng, vocab["networks"], rows, 1, 2, ", "),
+            "img url": [f"https://example.com/poster/{i}.jpg" for i in range(rows)],
+            "Episode": rng.choice(vocab["episodes"], rows),
+        }
+    )
+
+
+def _noisy_title(title: str, rnd: random.Random) -> str:
+    """One of the edits people make when typing a title from memory."""
+    edit = rnd.randrange(8)
+    if edit == 0:
+        return title.lower()
+    if edit == 1:
+        return re.sub(r"[^\w\s]", "", title)
+    if edit == 2:
+        return title[4:] if title.lower().startswith("the ") else "The " + title
+    if edit == 3 and len(title) > 4:
+        i = rnd.randrange(len(title) - 1)
+        return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+    if edit == 4 and len(title) > 4:
+        i = rnd.randrange(len(title))
+        return title[:i] + title[i + 1:]
+    if edit == 5:
+        return title + " "
+    return title
+
+
+def make_ratings(catalog: pd.DataFrame, rows: int, seed: int = 0, noise: float = 0.3, unknown: float = 0.05) -> pd.DataFrame:
+    """A personal ratings file (title, rating, year_watched, notes) for `catalog`."""
+    rng = np.random.default_rng(seed + 1)
+    rnd = random.Random(seed)
+
+    titles = catalog["Name"].to_numpy()[rng.integers(0, len(catalog), rows)].tolist()
+    for i in range(rows):
+        roll = rnd.random()
+        if roll < unknown:
+            titles[i] = " ".join(rnd.choice(["Untitled", "Lost", "Project", "Echo", "Zero"]) for _ in range(3)) + f" {i}"
+        elif roll < unknown + noise:
+            titles[i] = _noisy_title(titles[i], rnd)
+
+    return pd.DataFrame(
+        {
+            "title": titles,
+            "rating": rng.integers(10, 21, rows) / 2.0,
+            "year_watched": "",
+            "notes": "",
+        }
+    )
+
+
+def dataset(rows: int, ratings_rows: int, seed: int = 0, out_dir: Path = BENCH_DATA_DIR) -> tuple[Path, Path]:
+    """(catalog CSV, ratings CSV) paths, generated on first use and reused after."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    catalog_path = out_dir / f"catalog-{rows}-{seed}.csv"
+    ratings_path = out_dir / f"ratings-{rows}-{ratings_rows}-{seed}.csv"
+
+    catalog = None
+    if not catalog_path.exists():
+        catalog = make_catalog(rows, seed)
+        catalog.to_csv(catalog_path.with_suffix(".tmp"), index=False)
+        catalog_path.with_suffix(".tmp").replace(catalog_path)
+    if not ratings_path.exists():
+        if catalog is None:
+            catalog = pd.read_csv(catalog_path, usecols=["Name"])
+        make_ratings(catalog, ratings_rows, seed).to_csv(ratings_path, index=False)
+    return catalog_path, ratings_path
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("rows", type=int, help="catalog rows")
+    parser.add_argument("--ratings", type=int, default=None, help="rating rows (default rows // 10, at most 5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=BENCH_DATA_DIR)
+    args = parser.parse_args(argv)
+
+    ratings_rows = args.ratings or min(max(args.rows // 10, 1), 5000)
+    for path in dataset(args.rows, ratings_rows, args.seed, args.out):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
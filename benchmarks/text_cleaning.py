@@ -0,0 +1,88 @@
+# benchmarks/text_cleaning.py
+"""
+Micro-benchmark for the catalog's text cleaning: per-value `.apply` of
+`_fix_encoding` / `_normalize_title` against the vectorized column
+versions, on a synthetic catalog resampled from the bundled one (titles
+get a numeric suffix and some punctuation / articles so they stay
+distinct). Also checks that both produce identical output.
+
+    python benchmarks/text_cleaning.py [--rows 100000] [--runs 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.loader import default_data_paths  # noqa: E402
+from utils.text import (  # noqa: E402
+    _fix_encoding,
+    _fix_encoding_column,
+    _normalize_title,
+    _normalize_titles,
+)
+
+TEXT_COLUMNS = ["Name", "Sinopsis", "Genre", "Tags", "Main Cast"]
+
+
+def synthetic_catalog(rows: int, seed: int = 0) -> pd.DataFrame:
+    source = pd.read_csv(default_data_paths()[0], usecols=TEXT_COLUMNS)
+    rng = np.random.default_rng(seed)
+    catalog = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+
+    prefixes = np.array(["", "", "The ", "A ", "an "])[rng.integers(0, 5, rows)]
+    suffixes = np.array(["", "!", ": Part 2", " (2021)", "  "])[rng.integers(0, 5, rows)]
+    catalog["Name"] = prefixes + catalog["Name"].astype(str) + suffixes + " " + pd.Series(np.arange(rows)).astype(str)
+    return catalog
+
+
+def best_time(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    catalog = synthetic_catalog(args.rows)
+    cases = {
+        "fix_encoding x5": (
+            lambda: [catalog[c].apply(_fix_encoding) for c in TEXT_COLUMNS],
+            lambda: [_fix_encoding_column(catalog[c]) for c in TEXT_COLUMNS],
+        ),
+        "normalize_title": (
+            lambda: [catalog["Name"].apply(_normalize_title)],
+            lambda: [_normalize_titles(catalog["Name"])],
+        ),
+    }
+
+    print(f"{args.rows} rows, best of {args.runs}")
+    print(f"{'step':<18} {'apply s':>9} {'vector s':>9} {'speedup':>8}")
+    failures = []
+    for name, (slow, fast) in cases.items():
+        for expected, got in zip(slow(), fast()):
+            if not expected.equals(got):
+                failures.append(name)
+        t_slow, t_fast = best_time(slow, args.runs), best_time(fast, args.runs)
+        print(f"{name:<18} {t_slow:>9.3f} {t_fast:>9.3f} {t_slow / t_fast:>7.1f}x")
+
+    for name in failures:
+        print("FAIL", name, "output differs from .apply")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,12 @@
 import streamlit as st
 
 from utils.loader import load_and_prepare_data
-from utils.helpers import basic_rating_stats, find_local_poster
+from utils.helpers import basic_rating_stats
+from utils.posters import poster_paths
+from utils.thumbnails import thumbnails
+
+POSTERS_PER_ROW = 5
+DEFAULT_PAGE_SIZE = 20
 
 
 def run():
@@ -36,44 +41,46 @@ def run():
     st.markdown("---")
     st.subheader("🎬 All dramas I've rated (poster wall)")
 
-    # We’ll only show rows where we have an image URL
-    posters_df = merged.copy()
-
+    # Only the columns the wall needs
     # Prefer Kaggle title if present, else my title
-    posters_df["display_title"] = posters_df["title_me"].fillna(posters_df.get("title", ""))
+    posters_df = merged[["title_me", "rating", "img_url"]].assign(
+        display_title=merged["title_me"].fillna(merged.get("title", ""))
+    )
 
     # Sort by my rating (highest first)
     posters_df = posters_df.sort_values("rating", ascending=False)
 
-    # How many posters per row
-    posters_per_row = 5
-    rows = (len(posters_df) + posters_per_row - 1) // posters_per_row
-
-    # How many posters per row
-    posters_per_row = 5
-    rows = (len(posters_df) + posters_per_row - 1) // posters_per_row
-
-    for row_idx in range(rows):
-        cols = st.columns(posters_per_row)
-        for col_idx in range(posters_per_row):
-            i = row_idx * posters_per_row + col_idx
-            if i >= len(posters_df):
-                break
-
-            row = posters_df.iloc[i]
-            with cols[col_idx]:
-                img_url = row.get("img_url")
-                local_poster = find_local_poster(row["display_title"])
-
-                # 🔁 Prefer my local poster if it exists
-                if local_poster is not None:
-                    st.image(local_poster, use_container_width=True)
-                elif isinstance(img_url, str) and img_url.strip():
-                    st.image(img_url, use_container_width=True)
+    # Only one page of posters is resolved and rendered per rerun
+    page_size = st.select_slider(
+        "Posters per page", options=[10, 20, 30, 50, 100], value=DEFAULT_PAGE_SIZE
+    )
+    n_pages = max(1, (len(posters_df) + page_size - 1) // page_size)
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+    st.caption(f"Page {page} of {n_pages} · {len(posters_df)} dramas")
+
+    visible = posters_df.iloc[(page - 1) * page_size : page * page_size]
+
+    # 🔁 Resolve posters for the visible slice in one pass, local ones as small thumbnails
+    records = [
+        {"title": title, "rating": rating, "poster": poster}
+        for title, rating, poster in zip(
+            visible["display_title"],
+            visible["rating"],
+            thumbnails(poster_paths(visible["display_title"], visible["img_url"])),
+        )
+    ]
+
+    for start in range(0, len(records), POSTERS_PER_ROW):
+        cols = st.columns(POSTERS_PER_ROW)
+        for col, rec in zip(cols, records[start:start + POSTERS_PER_ROW]):
+            with col:
+                # 🔁 My own poster, else the mirrored img_url, else the img_url itself
+                if rec["poster"] is not None:
+                    st.image(rec["poster"], use_container_width=True)
                 else:
                     st.write("No image")
 
-                st.caption(f"{row['display_title']}  ⭐ {row['rating']:.1f}")
+                st.caption(f"{rec['title']}  ⭐ {rec['rating']:.1f}")
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@
 import streamlit as st
 
 from utils.loader import load_and_prepare_data
-from utils.visuals import rating_histogram, rating_vs_global_scatter
+from utils.visuals import payload_sizes, rating_histogram, rating_vs_global_scatter
 
 
 def run():
@@ -20,6 +20,9 @@ def run():
 
     st.subheader("My Rating vs Global Score")
     st.altair_chart(rating_vs_global_scatter(matched_df), use_container_width=True)
+    if st.query_params.get("diagnostics"):
+        sizes = ", ".join(f"{name} {size / 1024:.1f} KB" for name, size in payload_sizes().items())
+        st.caption(f"Chart specs sent to the browser: {sizes}")
 
     st.markdown("### Favorite Genres (min 3 shows)")
     fav_genres = genre_stats[genre_stats["count"] >= 3].copy()
@@ -37,6 +40,22 @@ def run():
         .round(2)
     )
 
+    st.markdown("### Breakdown by tag, network or release year")
+    # precomputed by the loader, so switching dimensions does no regrouping
+    dimension = st.selectbox(
+        "Group my ratings by",
+        ["tag", "network", "year"],
+        format_func={"tag": "Tag", "network": "Network", "year": "Release year (5-year buckets)"}.get,
+    )
+    min_count = st.slider("Minimum shows", 1, 10, 2)
+    breakdown = data[f"{dimension}_stats"]
+    if dimension == "year":
+        breakdown = breakdown.sort_index(ascending=False)
+    st.dataframe(
+        breakdown[breakdown["count"] >= min_count][["my_avg_rating", "global_avg_score", "count"]]
+        .round(2)
+    )
+
 
 if __name__ == "__main__":
     run()
@@ -1,18 +1,62 @@
 # pages/3_Recommendations.py
 
+import numpy as np
 import streamlit as st
 import pandas as pd
 
 
-from utils.recommender import build_recommendation_table
-from utils.recommender import explain_recommendation
-
+from utils import metrics
+from utils.collab import blend_scores
+from utils.helpers import year_label
+from utils.loader import load_and_prepare_data
+from utils.posters import poster_paths
+from utils.recommender import (
+    DEFAULT_WEIGHTS,
+    build_recommendation_table,
+    cached_engine,
+    collaborative_scores,
+    content_similarity_engine,
+    top_recommendations,
+)
+from utils.similarity import more_like_profile, more_like_title
+from utils.thumbnails import thumbnails
+
+
+def _diagnostics_panel():
+    """Timing breakdown of this run; shown with ?diagnostics=1 in the URL."""
+    report = metrics.last_run()
+    with st.expander("🛠 Diagnostics", expanded=True):
+        st.caption(f"Run {report['run']}: stages that executed on this rerun (cached stages are skipped)")
+        stages = pd.DataFrame(report["stages"], columns=["stage", "seconds", "rows"]).astype({"rows": "Int64"})
+        st.dataframe(stages, hide_index=True)
+        caches = pd.DataFrame.from_dict(report["caches"], orient="index", columns=["hits", "misses"])
+        st.dataframe(caches, use_container_width=True)
 
 
 def run():
+    metrics.start_run("recommendations")
     st.title("🎯 Recommendations")
 
-    candidates, favorite_genres, favorite_actors = build_recommendation_table()
+    with st.expander("⚙️ Tune the ranking"):
+        col_fav, col_weights = st.columns(2)
+        with col_fav:
+            st.caption("What counts as a favorite")
+            min_avg_rating = st.slider("Minimum average rating", 5.0, 10.0, 9.0, step=0.5)
+            min_genre_count = st.slider("Minimum shows per genre", 1, 10, 3)
+            min_actor_count = st.slider("Minimum shows per actor", 1, 10, 2)
+        with col_weights:
+            st.caption("Score weights (re-ranking only, nothing is recomputed)")
+            weights = {
+                "global": st.slider("Global score", 0.0, 1.0, DEFAULT_WEIGHTS["global"], step=0.05),
+                "genre": st.slider("Favorite genre overlap", 0.0, 1.0, DEFAULT_WEIGHTS["genre"], step=0.05),
+                "actor": st.slider("Favorite actor overlap", 0.0, 1.0, DEFAULT_WEIGHTS["actor"], step=0.05),
+            }
+
+    candidates, favorite_genres, favorite_actors = build_recommendation_table(
+        min_genre_count=min_genre_count,
+        min_actor_count=min_actor_count,
+        min_avg_rating=min_avg_rating,
+    )
 
     st.markdown("#### My favorite genres (used in scoring)")
     st.write(", ".join(favorite_genres) if favorite_genres else "None detected yet")
@@ -22,30 +66,45 @@ def run():
 
     st.markdown("---")
 
+    cf_scores = collaborative_scores()
+    if cf_scores is not None:
+        cf_weight = st.slider(
+            "Weight of ratings from similar viewers (collaborative filtering)",
+            0.0, 1.0, 0.5, step=0.1,
+        )
+        candidates = blend_scores(candidates, cf_scores, cf_weight)
+        weights["cf"] = cf_weight
+
     top_n = st.slider("How many recommendations to show?", 5, 30, 10, step=5)
+    diversity = st.slider(
+        "Variety (0 = strictly by score, higher = fewer look-alike genres and casts)",
+        0.0, 1.0, 0.0, step=0.05,
+    )
 
-    top_recos = (
-        candidates.sort_values("reco_score", ascending=False)
-        .head(top_n)
-        .copy()
+    top_recos = top_recommendations(
+        candidates, top_n, favorite_genres, favorite_actors,
+        weights=weights, diversity=diversity, engine=cached_engine(),
     )
 
     st.subheader("📺 Suggested dramas you haven't watched yet")
 
+    # Local or mirrored posters, else the remote img_url (see utils/posters.py)
+    posters = thumbnails(poster_paths(top_recos["title"], top_recos["img_url"]))
+
     # Show each recommendation as a 'card'
-    for _, row in top_recos.iterrows():
+    for (_, row), poster in zip(top_recos.iterrows(), posters):
         with st.container(border=True):
             col_img, col_info = st.columns([1, 2])
 
             with col_img:
-                if isinstance(row.get("img_url"), str) and row["img_url"].strip():
-                    st.image(row["img_url"], use_container_width=True)
+                if poster is not None:
+                    st.image(poster, use_container_width=True)
                 else:
                     st.write("No image")
 
             with col_info:
                 title = row.get("title", "Unknown title")
-                year = int(row["year"]) if not pd.isna(row["year"]) else "?"
+                year = year_label(row["year"])
                 st.markdown(f"### {title} ({year})")
 
                 st.markdown(
@@ -86,6 +145,50 @@ def run():
             use_container_width=True,
         )
 
+    st.markdown("---")
+    st.subheader("🔎 More like this")
+    st.write("Shows with similar synopses, tags and genres.")
+
+    data = load_and_prepare_data()
+    kdrama = data["kdrama"]
+    engine = content_similarity_engine()
+
+    source = st.radio(
+        "Find shows similar to", ["A specific title", "My top-rated dramas"], horizontal=True
+    )
+    exact = st.checkbox("Exact search (scan the whole catalog)", value=False)
+    n_similar = st.slider("How many similar shows?", 5, 20, 10, step=5)
+
+    if source == "A specific title":
+        position = st.selectbox(
+            "Title",
+            range(len(kdrama)),
+            format_func=lambda i: f"{kdrama['title'].iloc[i]} ({year_label(kdrama['year'].iloc[i])})",
+        )
+        positions, scores = more_like_title(engine, position, k=n_similar, exact=exact)
+    else:
+        top_rated = data["matched_df"]
+        top_rated = top_rated[top_rated["rating"] >= 9]
+        rated_positions = np.flatnonzero(kdrama["title_clean"].isin(top_rated["title_clean_matched"]))
+        weights = (
+            top_rated.groupby("title_clean_matched")["rating"].mean()
+            .reindex(kdrama["title_clean"].iloc[rated_positions])
+            .to_numpy()
+        )
+        positions, scores = more_like_profile(
+            engine, rated_positions, weights, k=n_similar, exact=exact
+        )
+
+    similar = kdrama.iloc[positions][["title", "year", "global_score", "genre"]].assign(similarity=scores)
+    st.dataframe(
+        similar.round({"global_score": 2, "similarity": 3}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    if st.query_params.get("diagnostics"):
+        _diagnostics_panel()
+
 
 if __name__ == "__main__":
     import pandas as pd  # needed for pd.isna in standalone run
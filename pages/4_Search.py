@@ -0,0 +1,70 @@
+# pages/4_Search.py
+
+import streamlit as st
+
+from utils.helpers import year_label
+from utils.loader import append_rating, cached_catalog, load_and_prepare_data
+from utils.search import autocomplete, search
+
+MAX_RESULTS = 10
+
+
+def _results(index: dict, query: str) -> list[int]:
+    """Titles starting with the query first, then typo-tolerant matches."""
+    found = autocomplete(index, query, MAX_RESULTS)
+    seen = set(found)
+    found += [i for i, _ in search(index, query, MAX_RESULTS) if i not in seen]
+    return found[:MAX_RESULTS]
+
+
+def run():
+    st.title("🔍 Search")
+    st.write("Look up a drama by title (typos are fine) and add it to my ratings.")
+
+    catalog = cached_catalog()
+    kdrama = catalog["kdrama"]
+    index = catalog["title_index"]["search"]
+
+    query = st.text_input("Title", placeholder="e.g. crash landing, reply 1988, vincenzo")
+    if not query.strip():
+        return
+
+    positions = _results(index, query)
+    if not positions:
+        st.info("No matching titles in the catalog.")
+        return
+
+    position = st.radio(
+        "Matches",
+        positions,
+        format_func=lambda i: f"{kdrama['title'].iloc[i]} ({year_label(kdrama['year'].iloc[i])})",
+    )
+    show = kdrama.iloc[position]
+
+    with st.container(border=True):
+        st.markdown(f"### {show['title']} ({year_label(show['year'])})")
+        st.markdown(f"**Global score:** {show['global_score']:.1f}")
+        if isinstance(show["genre"], str) and show["genre"].strip():
+            st.markdown(f"**Genres:** {show['genre']}")
+        if isinstance(show["cast"], str) and show["cast"].strip():
+            st.markdown(f"**Cast:** {show['cast']}")
+        if isinstance(show["synopsis"], str) and show["synopsis"].strip():
+            st.write(show["synopsis"])
+
+    my_ratings = load_and_prepare_data()["my_ratings"]
+    previous = my_ratings[my_ratings["title_clean_matched"] == show["title_clean"]]
+    if len(previous):
+        st.caption(f"Already rated: {', '.join(f'{r:g}' for r in previous['rating'])}")
+
+    with st.form("add_rating", clear_on_submit=True):
+        st.markdown("#### Add to my ratings")
+        rating = st.slider("My rating", 1.0, 10.0, 8.0, step=0.1)
+        year_watched = st.text_input("Year watched (optional)")
+        notes = st.text_input("Notes (optional)")
+        if st.form_submit_button("Add rating"):
+            append_rating(show["title"], rating, year_watched=year_watched.strip(), notes=notes.strip())
+            st.success(f"Added {show['title']} ({rating:g}). The other pages pick it up on their next run.")
+
+
+if __name__ == "__main__":
+    run()
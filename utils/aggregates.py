@@ -0,0 +1,132 @@
+# utils/aggregates.py
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .features import _encode_lists
+
+# analytics dimension -> source column; all but "year" are comma separated lists
+DIMENSIONS = {
+    "genre": "genre",
+    "actor": "cast",
+    "tag": "tags",
+    "network": "network",
+    "year": "year",
+}
+YEAR_BUCKET = 5  # years per "year" bucket, e.g. 2015-2019
+
+TOTAL_COLUMNS = ["rating_sum", "rating_n", "global_sum", "global_n", "count"]
+# rating / score sums are kept as int64 in hundredths, so adding and removing
+# rows is exact and running totals never drift from a fresh recompute
+SUM_SCALE = 100
+
+
+def score_values(scores: pd.Series) -> pd.Series:
+    """
+    Catalog scores (stored as float32) back in float64, for arithmetic and
+    for output. A plain upcast keeps the float32 error (8.1 becomes
+    8.1000003815, in JSON too); scores have one decimal, so rounding
+    restores the exact parsed values.
+    """
+    return scores.astype("float64").round(2)
+
+
+def _year_buckets(years: pd.Series) -> pd.Series:
+    start = (pd.to_numeric(years, errors="coerce") // YEAR_BUCKET) * YEAR_BUCKET
+    labels = start.astype("Int64").astype(str) + "-" + (start + YEAR_BUCKET - 1).astype("Int64").astype(str)
+    return labels.where(start.notna())
+
+
+def encode_dimension(frame: pd.DataFrame, dimension: str) -> tuple:
+    """
+    Integer-code one dimension of `frame` as CSR parts (indptr, codes, vocab):
+    row i has the vocabulary entries codes[indptr[i]:indptr[i + 1]].
+    """
+    values = frame[DIMENSIONS[dimension]]
+    if dimension == "year":
+        values = _year_buckets(values)
+    return _encode_lists(values)
+
+
+def entity_totals(frame: pd.DataFrame, dimension: str, by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Per-entity sums and counts of `rating` and `global_score` over the rows
+    of `frame`, for one dimension: the running totals behind the stats tables.
+
+    Every row is credited to each entity in its list, in a single
+    np.bincount pass per column over the integer codes. With `by` the totals
+    are per (by, entity) pair instead. Sums are in 1/SUM_SCALE units (see
+    `mean_values`).
+    """
+    indptr, codes, vocab = encode_dimension(frame, dimension)
+    lengths = np.diff(indptr)
+
+    rating = np.repeat(frame["rating"].to_numpy(dtype=float), lengths)
+    global_score = np.repeat(score_values(frame["global_score"]).to_numpy(), lengths)
+    titled = np.repeat(frame["title_me"].notna().to_numpy(), lengths)
+
+    if by is None:
+        keys, n_keys = codes, len(vocab)
+    else:
+        groups, group_values = pd.factorize(frame[by], sort=True)
+        pairs = np.repeat(groups.astype(np.int64), lengths) * len(vocab) + codes
+        pairs, keys = np.unique(pairs, return_inverse=True)
+        n_keys = len(pairs)
+
+    def total(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(keys, weights=weights, minlength=n_keys)
+
+    def scaled_total(values: np.ndarray) -> np.ndarray:
+        # integer units; bincount sums them in float64, exactly below 2**53
+        units = np.rint(np.where(np.isnan(values), 0.0, values) * SUM_SCALE)
+        return total(units).astype("int64")
+
+    rated = ~np.isnan(rating)
+    scored = ~np.isnan(global_score)
+    totals = {
+        "rating_sum": scaled_total(rating),
+        "rating_n": total(rated).astype("int64"),
+        "global_sum": scaled_total(global_score),
+        "global_n": total(scored).astype("int64"),
+        "count": total(titled).astype("int64"),
+    }
+
+    if by is None:
+        index = pd.Index(vocab, name=dimension)
+    else:
+        index = pd.MultiIndex.from_arrays(
+            [group_values[pairs // len(vocab)], vocab[pairs % len(vocab)]], names=[by, dimension]
+        )
+    return pd.DataFrame(totals, index=index)
+
+
+def update_totals(totals: pd.DataFrame, added: pd.DataFrame, removed: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """`totals` plus the totals of the `added` rows, minus those of the `removed` rows."""
+    totals = (
+        totals
+        .add(entity_totals(added, dimension), fill_value=0)
+        .sub(entity_totals(removed, dimension), fill_value=0)
+    )
+    totals = totals.astype("int64")
+    counts = ["rating_n", "global_n", "count"]
+    return totals[(totals[counts] > 0).any(axis=1)]
+
+
+def mean_values(totals: pd.DataFrame, name: str) -> pd.Series:
+    """Mean `name` ("rating" or "global") per entity from its exact integer sum and count."""
+    return totals[f"{name}_sum"] / (totals[f"{name}_n"] * SUM_SCALE)
+
+
+def stats_from_totals(totals: pd.DataFrame) -> pd.DataFrame:
+    """Average my rating / global score and show count per entity, most shows first."""
+    totals = totals.sort_index()
+    stats = pd.DataFrame(
+        {
+            "my_avg_rating": mean_values(totals, "rating"),
+            "global_avg_score": mean_values(totals, "global"),
+            "count": totals["count"].astype("int64"),
+        }
+    )
+    return stats.sort_values(["count", "my_avg_rating"], ascending=[False, False])
@@ -0,0 +1,223 @@
+# utils/batch.py
+"""
+Batch job: recommendations for a directory of per-user rating CSVs shaped
+like data/my_kdrama_ratings.csv (one user per file; the file name without
+.csv is the user id).
+
+    python -m utils.batch ratings_dir/ --out recos.jsonl --workers 8
+
+The catalog and its feature matrix are prepared once, up front, into the
+memory-mapped disk cache (see `load_catalog`), so every worker opens them
+without parsing and all workers share one copy. Users are fanned out over
+a ProcessPoolExecutor in chunks; each chunk is matched, aggregated and
+scored with `recommend_many`. Results are written as chunks finish: JSONL
+(one line per user) or Parquet (one row per recommendation), by the
+suffix of --out. The output file appears once the job is done.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from .loader import default_data_paths
+from .metrics import span
+from .recommender import cached_engine, recommend_many
+from .service import RESULT_COLUMNS, _result_json
+
+CHUNK_USERS = 64  # users per worker task
+
+# per-process state set up by `_init_worker`
+_worker: dict = {}
+
+
+def _init_worker(kaggle_path: str, top_n: int, shortlist: Optional[int] = None) -> None:
+    # forked workers inherit the parent's engine; others map it from disk
+    _worker["engine"] = cached_engine(kaggle_path)
+    _worker["top_n"] = top_n
+    _worker["shortlist"] = shortlist
+
+
+def _read_ratings(path: Path) -> pd.DataFrame:
+    ratings = pd.read_csv(path)
+    missing = {"title", "rating"} - set(ratings.columns)
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(sorted(missing))}")
+    return ratings.assign(rating=pd.to_numeric(ratings["rating"], errors="coerce"))
+
+
+def _recommend_chunk(paths: list[str]) -> list[dict]:
+    """Worker task: one record per rating file, {"user", "error"} if it could not be read."""
+    records, users = [], {}
+    for path in paths:
+        user = Path(path).stem
+        try:
+            users[user] = _read_ratings(Path(path))
+        except (OSError, ValueError, pd.errors.ParserError) as exc:
+            records.append({"user": user, "error": str(exc)})
+
+    # one matching thread per worker process: the pool provides the parallelism
+    results = {}
+    if users:
+        results = recommend_many(
+            _worker["engine"], users, _worker["top_n"], workers=1, shortlist=_worker["shortlist"]
+        )
+    records.extend({"user": user, **_result_json(result)} for user, result in results.items())
+    return records
+
+
+def _parquet_frame(records: list[dict]) -> pd.DataFrame:
+    """One row per (user, rank); users whose file failed get one row with `error`."""
+    frames = []
+    for record in records:
+        if "error" in record:
+            frames.append(pd.DataFrame({"user": [record["user"]], "error": [record["error"]]}))
+            continue
+        recos = pd.DataFrame(record["recommendations"], columns=RESULT_COLUMNS)
+        recos.insert(0, "rank", range(1, len(recos) + 1))
+        recos.insert(0, "user", record["user"])
+        frames.append(recos)
+    columns = ["user", "rank"] + RESULT_COLUMNS + ["error"]
+    return pd.concat(frames, ignore_index=True).reindex(columns=columns) if frames else pd.DataFrame(columns=columns)
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    text = ["title", "genre", "cast", "img_url", "why_recommended"]
+    return pa.schema(
+        [("user", pa.string()), ("rank", pa.int64()), ("year", pa.int64()), ("global_score", pa.float64())]
+        + [(c, pa.string()) for c in text]
+        + [("genre_overlap", pa.int64()), ("actor_overlap", pa.int64()), ("reco_score", pa.float64())]
+        + [("error", pa.string())]
+    )
+
+
+@contextmanager
+def _output(path: Path):
+    """
+    Yield a `write(records)` function appending to `path` (.jsonl or
+    .parquet). Written to a temp file that replaces `path` when done.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if path.suffix == ".parquet":
+        import pyarrow as pa  # deferred: only needed for Parquet output
+        import pyarrow.parquet as pq
+
+        schema = _parquet_schema()
+        writer = pq.ParquetWriter(tmp, schema)
+
+        def write(records):
+            frame = _parquet_frame(records)[schema.names]
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+        close = writer.close
+    elif path.suffix == ".jsonl":
+        f = open(tmp, "w", encoding="utf-8")
+
+        def write(records):
+            f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            f.flush()
+
+        close = f.close
+    else:
+        raise ValueError(f"unsupported output {path.name}: use .jsonl or .parquet")
+
+    try:
+        yield write
+        close()
+        os.replace(tmp, path)
+    except BaseException:
+        close()
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def run_batch(
+    ratings_dir: Path,
+    out: Path,
+    kaggle_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    top_n: int = 10,
+    chunk_users: int = CHUNK_USERS,
+    shortlist: Optional[int] = None,
+    progress=None,
+) -> dict:
+    """
+    Recommend for every *.csv in `ratings_dir` into `out`; returns the
+    job summary (users, errors, seconds, users_per_second, ...).
+    `shortlist` is passed on to the title matcher (see `_match_titles`).
+    """
+    kaggle_path = str(kaggle_path or default_data_paths()[0])
+    workers = workers or os.cpu_count() or 1
+    files = sorted(str(p) for p in Path(ratings_dir).glob("*.csv"))
+    chunks = [files[i:i + chunk_users] for i in range(0, len(files), chunk_users)]
+
+    start = time.perf_counter()
+    with span("batch.prepare"):
+        # parse / encode the catalog into the disk cache before forking
+        _init_worker(kaggle_path, top_n, shortlist)
+    prepared = time.perf_counter()
+
+    done = errors = 0
+    with span("batch.recommend", rows=len(files)), _output(Path(out)) as write:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(kaggle_path, top_n, shortlist)) as pool:
+            for future in as_completed([pool.submit(_recommend_chunk, chunk) for chunk in chunks]):
+                records = future.result()
+                write(records)
+                done += len(records)
+                errors += sum("error" in r for r in records)
+                if progress is not None:
+                    elapsed = time.perf_counter() - prepared
+                    print(f"{done}/{len(files)} users, {done / elapsed:.1f} users/s", file=progress, flush=True)
+
+    seconds = time.perf_counter() - prepared
+    return {
+        "users": done - errors,
+        "errors": errors,
+        "workers": workers,
+        "prepare_seconds": round(prepared - start, 3),
+        "seconds": round(seconds, 3),
+        "users_per_second": round(done / seconds, 1) if seconds > 0 else None,
+        "out": str(out),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recommend for a directory of per-user rating CSVs.")
+    parser.add_argument("ratings_dir", type=Path, help="directory of <user_id>.csv files (title, rating)")
+    parser.add_argument("--out", type=Path, required=True, help="output file, .jsonl or .parquet")
+    parser.add_argument("--catalog", type=Path, default=default_data_paths()[0])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--chunk-users", type=int, default=CHUNK_USERS)
+    parser.add_argument(
+        "--shortlist", type=int, default=None,
+        help="match titles against their N closest catalog titles by trigrams only (much faster on big catalogs)",
+    )
+    args = parser.parse_args(argv)
+
+    summary = run_batch(
+        args.ratings_dir,
+        args.out,
+        args.catalog,
+        args.workers,
+        args.top_n,
+        args.chunk_users,
+        args.shortlist,
+        progress=sys.stderr,
+    )
+    print(json.dumps(summary))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
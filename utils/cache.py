@@ -0,0 +1,324 @@
+# utils/cache.py
+
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"  # project root
+# file inside each entry recording the pipeline version that wrote it
+VERSION_FILE = "VERSION"
+# files that make a directory of the cache dir an entry (see `prune_entries`)
+_ENTRY_SUFFIXES = (".parquet", ".arrow", ".npy")
+
+# disk cache lookups, reported as the "disk" cache
+_disk_stats = {"hits": 0, "misses": 0}
+metrics.register_cache("disk", lambda: (_disk_stats["hits"], _disk_stats["misses"]))
+
+
+def file_digest(*paths: Path, version: str = "") -> str:
+    """Hash the content of the given files (plus a version tag) into a cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(version.encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def file_key(path: Path, version: str = "", cache_dir: Path = CACHE_DIR) -> str:
+    """
+    `file_digest` of one file, remembered on disk against its size and
+    modification time, so a new process does not re-read an unchanged file.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    signature = f"{stat.st_size} {stat.st_mtime_ns} {version}"
+    name = "digest-" + hashlib.blake2b(str(path).encode(), digest_size=8).hexdigest()
+
+    recorded = read_pointer(name, cache_dir)
+    if recorded and recorded.rsplit(" ", 1)[0] == signature:
+        return recorded.rsplit(" ", 1)[1]
+    key = file_digest(path, version=version)
+    write_pointer(name, f"{signature} {key}", cache_dir)
+    return key
+
+
+def _tmp_path(cache_dir: Path, name: str, suffix: str = ".tmp") -> Path:
+    """Temp path for writing `name`, private to this process and thread."""
+    return cache_dir / f".{name}.{os.getpid()}.{threading.get_ident()}{suffix}"
+
+
+def _start_entry(tmp: Path, version: str) -> None:
+    tmp.mkdir(parents=True, exist_ok=True)
+    if version:
+        (tmp / VERSION_FILE).write_text(version)
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    if path.suffix == ".arrow":
+        import pyarrow.feather as feather  # deferred: only needed for mapped entries
+
+        # zero-copy: text and numeric columns stay views of the mapped
+        # file, i.e. of page cache shared by every process reading it
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    return pd.read_parquet(path)
+
+
+def load_frames(key: str, cache_dir: Path = CACHE_DIR) -> Optional[dict]:
+    """
+    Return the DataFrames stored under `key` as {name: DataFrame},
+    or None if there is no (readable) entry for it.
+    """
+    entry = cache_dir / key
+    if not entry.is_dir():
+        _disk_stats["misses"] += 1
+        return None
+    try:
+        frames = {path.stem: _read_frame(path) for path in entry.iterdir() if path.suffix in (".parquet", ".arrow")}
+    except Exception:
+        _disk_stats["misses"] += 1
+        return None
+    _disk_stats["hits"] += 1
+    return frames
+
+
+def save_frames(
+    key: str, frames: dict, cache_dir: Path = CACHE_DIR, mapped: bool = False, version: str = ""
+) -> bool:
+    """
+    Store {name: DataFrame} as one Parquet file per frame under `key`, or
+    with `mapped` as uncompressed Arrow IPC files that `load_frames`
+    memory-maps instead of decoding. `version` is recorded in the entry
+    for `prune_entries`.
+
+    The entry is written to a temp directory and renamed into place, so
+    concurrent readers never see a half-written entry. Returns False if the
+    cache directory is not writable.
+    """
+    entry = cache_dir / key
+    tmp = _tmp_path(cache_dir, key)
+    try:
+        _start_entry(tmp, version)
+        for name, df in frames.items():
+            if mapped:
+                import pyarrow.feather as feather  # deferred: only needed for mapped entries
+
+                feather.write_feather(df, tmp / f"{name}.arrow", compression="uncompressed")
+            else:
+                df.to_parquet(tmp / f"{name}.parquet")
+        os.replace(tmp, entry)
+    except Exception:
+        # another process won the race, the disk is read-only,
+        # or a frame could not be serialized
+        shutil.rmtree(tmp, ignore_errors=True)
+        return entry.is_dir()
+    return True
+
+
+def save_frame_chunks(
+    key: str,
+    name: str,
+    chunks: Iterable,
+    cache_dir: Path = CACHE_DIR,
+    mapped: bool = False,
+    version: str = "",
+) -> bool:
+    """
+    Store a frame that arrives as DataFrame chunks (same columns, e.g. from
+    `pd.read_csv(..., chunksize=...)`) as one Parquet file `name` under
+    `key`, one row group per chunk (with `mapped`, one Arrow IPC record
+    batch per chunk). Only one chunk is held in memory at a time. Written
+    and renamed into place like `save_frames`.
+    """
+    import pyarrow as pa  # deferred: only needed for streamed entries
+    import pyarrow.parquet as pq
+
+    entry = cache_dir / key
+    tmp = _tmp_path(cache_dir, key)
+    writer = None
+    try:
+        _start_entry(tmp, version)
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # a column that is all-missing in the first chunk has no type yet
+                schema = pa.schema(
+                    [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema],
+                    metadata=table.schema.metadata,
+                )
+                if mapped:
+                    writer = pa.ipc.new_file(str(tmp / f"{name}.arrow"), schema)
+                else:
+                    writer = pq.ParquetWriter(tmp / f"{name}.parquet", schema)
+            writer.write_table(table.cast(schema))
+        if writer is None:
+            raise ValueError("no chunks to write")
+        writer.close()
+        writer = None
+        os.replace(tmp, entry)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+        return entry.is_dir()
+    return True
+
+
+def load_arrays(key: str, cache_dir: Path = CACHE_DIR) -> Optional[dict]:
+    """
+    Return the arrays stored under `key` as {name: ndarray}, memory-mapped
+    read-only, or None if there is no (readable) entry for it.
+    """
+    entry = cache_dir / key
+    if not entry.is_dir():
+        _disk_stats["misses"] += 1
+        return None
+    try:
+        arrays = {path.stem: np.load(path, mmap_mode="r") for path in entry.glob("*.npy")}
+    except Exception:
+        _disk_stats["misses"] += 1
+        return None
+    _disk_stats["hits"] += 1
+    return arrays
+
+
+def save_arrays(key: str, arrays: dict, cache_dir: Path = CACHE_DIR, version: str = "") -> bool:
+    """Store {name: ndarray} as one .npy file per array under `key`, like `save_frames`."""
+    entry = cache_dir / key
+    tmp = _tmp_path(cache_dir, key)
+    try:
+        _start_entry(tmp, version)
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.asarray(array), allow_pickle=False)
+        os.replace(tmp, entry)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return entry.is_dir()
+    return True
+
+
+def remove_entry(key: str, cache_dir: Path = CACHE_DIR) -> int:
+    """
+    Delete the entry `key` (and a pointer named after it); returns the bytes
+    freed. The entry is renamed away first, so readers see it either whole
+    or gone, and processes that memory-mapped its files keep their mapping.
+    """
+    entry = cache_dir / key
+    tmp = _tmp_path(cache_dir, key, ".removed")
+    try:
+        os.replace(entry, tmp)
+    except OSError:
+        return 0
+    size = sum(p.stat().st_size for p in tmp.iterdir() if p.is_file())
+    shutil.rmtree(tmp, ignore_errors=True)
+    (cache_dir / f"{key}.last").unlink(missing_ok=True)
+    return size
+
+
+def prune_entries(version: str, cache_dir: Path = CACHE_DIR) -> dict:
+    """
+    Delete every entry not written by pipeline `version` (entries from
+    before versions were recorded included). Only directories holding
+    cache files count as entries, so the thumbnail / poster / benchmark
+    directories are left alone. Returns {"entries", "bytes"} removed.
+    """
+    removed = {"entries": 0, "bytes": 0}
+    try:
+        candidates = [p for p in cache_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+    except OSError:
+        return removed
+    for entry in candidates:
+        try:
+            recorded = (entry / VERSION_FILE).read_text().strip()
+        except OSError:
+            recorded = None
+            if not any(p.suffix in _ENTRY_SUFFIXES for p in entry.glob("*")):
+                continue
+        if recorded == version:
+            continue
+        removed["bytes"] += remove_entry(entry.name, cache_dir)
+        removed["entries"] += not entry.exists()
+    return removed
+
+
+def read_pointer(name: str, cache_dir: Path = CACHE_DIR) -> Optional[str]:
+    """Return the key last recorded under `name` by `write_pointer`, if any."""
+    try:
+        return (cache_dir / f"{name}.last").read_text().strip() or None
+    except OSError:
+        return None
+
+
+def write_pointer(name: str, key: str, cache_dir: Path = CACHE_DIR) -> None:
+    """Atomically record `key` as the latest entry for `name`."""
+    tmp = _tmp_path(cache_dir, name, ".last")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(key)
+        os.replace(tmp, cache_dir / f"{name}.last")
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+class MemoryCache:
+    """
+    Small in-process LRU cache for pipeline results, keyed by hashable
+    tuples (file signatures, parameters). Values are shared between callers,
+    not copied, so they must be treated as read-only. Named caches are
+    reported by `utils.metrics`.
+    """
+
+    def __init__(self, maxsize: int = 8, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        if name is not None:
+            metrics.register_cache(name, lambda: (self.hits, self.misses))
+        self._entries: OrderedDict = OrderedDict()
+        # guards the entries; held only for lookups and inserts, never while building
+        self._lock = threading.Lock()
+        # key -> lock held while that entry is built, so concurrent misses
+        # build it once and hits on other keys never wait
+        self._building: dict = {}
+
+    def get_or_build(self, key, build: Callable):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                # built by another caller while this one waited
+                if key in self._entries:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+                self.misses += 1
+
+            try:
+                value = build()
+                with self._lock:
+                    self._entries[key] = value
+                    if len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
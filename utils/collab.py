@@ -0,0 +1,204 @@
+# utils/collab.py
+
+import argparse
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR
+from .loader import _match_titles, load_catalog
+from .text import _normalize_titles
+
+MODEL_PATH = CACHE_DIR / "collab_model.npz"
+
+
+def build_ratings_store(ratings: pd.DataFrame, catalog: dict) -> pd.DataFrame:
+    """
+    Turn raw multi-user ratings (user_id, title, rating) into the store
+    format (user_id, title_clean_matched, rating), matching titles against
+    the catalog. Unmatched titles are dropped; repeated ratings of one
+    show by one user are averaged.
+    """
+    titles_clean = _normalize_titles(ratings["title"])
+    store = pd.DataFrame(
+        {
+            "user_id": ratings["user_id"].astype(str),
+            "title_clean_matched": _match_titles(titles_clean, catalog["title_index"]),
+            "rating": pd.to_numeric(ratings["rating"], errors="coerce"),
+        }
+    ).dropna()
+    return store.groupby(["user_id", "title_clean_matched"], as_index=False)["rating"].mean()
+
+
+def load_ratings_store(path: Path, catalog: dict) -> pd.DataFrame:
+    """Read a CSV or Parquet file of (user_id, title, rating) rows into the store format."""
+    path = Path(path)
+    raw = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    return build_ratings_store(raw, catalog)
+
+
+def _fold_in(item_factors: np.ndarray, items: np.ndarray, residuals: np.ndarray, reg: float) -> np.ndarray:
+    """Least-squares user vector for the given rated items (one ALS half-step)."""
+    v = item_factors[items]
+    gram = v.T @ v + reg * len(items) * np.eye(v.shape[1])
+    return np.linalg.solve(gram, v.T @ residuals)
+
+
+def train_als(
+    store: pd.DataFrame,
+    n_factors: int = 32,
+    reg: float = 0.1,
+    n_iters: int = 15,
+    seed: int = 0,
+) -> dict:
+    """
+    Explicit-feedback ALS on the (users x shows) rating matrix, centered on
+    the global mean, with weighted-lambda regularization.
+
+    Returns the model as a dict of arrays: item factors and titles, user
+    factors and ids, the global mean and `reg`.
+    """
+    from scipy import sparse
+
+    user_codes, user_ids = pd.factorize(store["user_id"])
+    item_codes, item_titles = pd.factorize(store["title_clean_matched"])
+    mu = float(store["rating"].mean())
+
+    r = sparse.csr_matrix(
+        (store["rating"].to_numpy(dtype=np.float64) - mu, (user_codes, item_codes)),
+        shape=(len(user_ids), len(item_titles)),
+    )
+    r_items = r.T.tocsr()
+
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.1, size=(len(user_ids), n_factors))
+    item_factors = rng.normal(scale=0.1, size=(len(item_titles), n_factors))
+
+    def solve_side(matrix, fixed, out):
+        for row in range(matrix.shape[0]):
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            if start == end:
+                out[row] = 0.0
+                continue
+            out[row] = _fold_in(fixed, matrix.indices[start:end], matrix.data[start:end], reg)
+
+    for _ in range(n_iters):
+        solve_side(r, item_factors, user_factors)
+        solve_side(r_items, user_factors, item_factors)
+
+    return {
+        "item_factors": item_factors.astype(np.float32),
+        "item_titles": np.asarray(item_titles, dtype=object),
+        "user_factors": user_factors.astype(np.float32),
+        "user_ids": np.asarray(user_ids, dtype=object),
+        "mu": mu,
+        "reg": reg,
+    }
+
+
+def save_model(model: dict, path: Path = MODEL_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        item_factors=model["item_factors"],
+        item_titles=model["item_titles"].astype(str),
+        user_factors=model["user_factors"],
+        user_ids=model["user_ids"].astype(str),
+        mu=model["mu"],
+        reg=model["reg"],
+    )
+    tmp.replace(path)
+
+
+def load_model(path: Path = MODEL_PATH) -> Optional[dict]:
+    """
+    Load a model saved by `save_model`, or None if there is none. A
+    truncated or corrupt file also gives None, like a missing model.
+    """
+    try:
+        with np.load(path) as f:
+            model = {k: f[k] for k in f.files}
+        model["mu"] = float(model["mu"])
+        model["reg"] = float(model["reg"])
+        model["item_pos"] = pd.Index(model["item_titles"])
+        model["user_pos"] = pd.Index(model["user_ids"])
+    except (OSError, EOFError, ValueError, KeyError, TypeError, zipfile.BadZipFile):
+        return None
+    return model
+
+
+def score_user(model: dict, user_id: str) -> pd.Series:
+    """Predicted ratings for every show for a user the model was trained on."""
+    u = model["user_factors"][model["user_pos"].get_loc(str(user_id))]
+    return pd.Series(model["item_factors"] @ u + model["mu"], index=model["item_pos"])
+
+
+def score_ratings(model: dict, titles_clean_matched, ratings) -> pd.Series:
+    """
+    Predicted ratings for every show for a user who is not in the model,
+    folded in from their (matched title, rating) pairs against the fixed
+    item factors. No retraining happens.
+    """
+    pos = model["item_pos"].get_indexer(pd.Index(titles_clean_matched))
+    known = pos >= 0
+    if not known.any():
+        return pd.Series(model["mu"], index=model["item_pos"])
+
+    residuals = np.asarray(ratings, dtype=np.float64)[known] - model["mu"]
+    u = _fold_in(model["item_factors"].astype(np.float64), pos[known], residuals, model["reg"])
+    return pd.Series(model["item_factors"] @ u + model["mu"], index=model["item_pos"])
+
+
+def blend_scores(candidates: pd.DataFrame, cf_scores: pd.Series, weight: float = 0.5) -> pd.DataFrame:
+    """
+    Add the collaborative prediction as `cf_score` (and `cf_score_norm`, on
+    the same 0-1 scale as the global-score term) and blend it into
+    reco_score. Shows the model has never seen get its global mean.
+    """
+    mean = float(cf_scores.mean()) if len(cf_scores) else 0.0
+    cf_score = candidates["title_clean"].map(cf_scores).fillna(mean)
+    cf_score_norm = cf_score / 10.0
+    return candidates.assign(
+        cf_score=cf_score,
+        cf_score_norm=cf_score_norm,
+        reco_score=candidates["reco_score"] + cf_score_norm * weight,
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Train the collaborative-filtering model from a multi-user ratings file."
+    )
+    parser.add_argument("ratings", type=Path, help="CSV/Parquet with user_id, title, rating")
+    parser.add_argument(
+        "--catalog",
+        type=Path,
+        default=Path(__file__).resolve().parent.parent / "data" / "kdrama_kaggle_1500.csv",
+    )
+    parser.add_argument("--out", type=Path, default=MODEL_PATH)
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--reg", type=float, default=0.1)
+    parser.add_argument("--iters", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    store = load_ratings_store(args.ratings, load_catalog(args.catalog))
+    model = train_als(store, n_factors=args.factors, reg=args.reg, n_iters=args.iters)
+    save_model(model, args.out)
+
+    loaded = load_model(args.out)
+    users = loaded["user_factors"][loaded["user_pos"].get_indexer(store["user_id"])]
+    items = loaded["item_factors"][loaded["item_pos"].get_indexer(store["title_clean_matched"])]
+    pred = np.einsum("ij,ij->i", users, items) + loaded["mu"]
+    rmse = float(np.sqrt(np.mean((pred - store["rating"].to_numpy()) ** 2)))
+
+    print(f"trained on {len(store)} ratings, {len(model['user_ids'])} users, "
+          f"{len(model['item_titles'])} shows; train RMSE {rmse:.3f} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# utils/features.py
+
+import numpy as np
+import pandas as pd
+
+# comma separated columns encoded into the catalog feature matrix, in column order
+FEATURE_BLOCKS = {
+    "genre": "genre",
+    "actor": "cast",
+    "tag": "tags",
+}
+
+
+def _encode_lists(values: pd.Series) -> tuple:
+    """
+    Encode a column of comma separated strings ("Action, Drama") as CSR
+    parts: (indptr, indices, vocab), without building a list per row.
+    Repeated values within a row are kept, so row sums equal list lengths.
+    """
+    items = values.reset_index(drop=True).str.split(",").explode().str.strip()
+    items = items[items.notna() & (items != "")]
+
+    lengths = np.bincount(items.index.to_numpy(dtype=np.int64), minlength=len(values))
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+
+    codes, vocab = pd.factorize(items, sort=True)
+    return indptr, codes.astype(np.int32), pd.Index(vocab)
+
+
+def build_feature_matrix(df: pd.DataFrame) -> dict:
+    """
+    Multi-hot encode the genre / cast / tag columns of `df` as one
+    scipy CSR matrix (rows aligned with `df`, one column per vocabulary item).
+
+    Returns {"matrix": csr, "vocab": {block: Index}, "offsets": {block: int}}.
+    """
+    from scipy import sparse
+
+    blocks = []
+    vocab = {}
+    offsets = {}
+    n_cols = 0
+
+    for block, column in FEATURE_BLOCKS.items():
+        indptr, indices, block_vocab = _encode_lists(df[column])
+        blocks.append(
+            sparse.csr_matrix(
+                (np.ones(len(indices)), indices, indptr),
+                shape=(len(df), len(block_vocab)),
+            )
+        )
+        vocab[block] = block_vocab
+        offsets[block] = n_cols
+        n_cols += len(block_vocab)
+
+    matrix = sparse.hstack(blocks, format="csr")
+    matrix.sum_duplicates()
+    return {"matrix": matrix, "vocab": vocab, "offsets": offsets}
+
+
+def feature_arrays(features: dict) -> dict:
+    """A feature matrix as flat arrays {name: ndarray}, e.g. for `save_arrays`."""
+    matrix = features["matrix"]
+    arrays = {"data": matrix.data, "indices": matrix.indices, "indptr": matrix.indptr}
+    for block, vocab in features["vocab"].items():
+        arrays[f"vocab_{block}"] = np.asarray(vocab, dtype=str)
+    return arrays
+
+
+def features_from_arrays(arrays: dict) -> dict:
+    """
+    Inverse of `feature_arrays`. The matrix is built on the given arrays
+    without copying, so memory-mapped arrays stay shared.
+    """
+    from scipy import sparse
+
+    vocab = {}
+    offsets = {}
+    n_cols = 0
+    for block in FEATURE_BLOCKS:
+        vocab[block] = pd.Index(arrays[f"vocab_{block}"].tolist(), dtype="str")
+        offsets[block] = n_cols
+        n_cols += len(vocab[block])
+
+    indptr = arrays["indptr"]
+    matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], indptr), shape=(len(indptr) - 1, n_cols))
+    return {"matrix": matrix, "vocab": vocab, "offsets": offsets}
+
+
+def favorite_vector(features: dict, block: str, names: list[str]) -> np.ndarray:
+    """Indicator vector over the feature columns for `names` in one block."""
+    vec = np.zeros(features["matrix"].shape[1])
+    positions = features["vocab"][block].get_indexer(names)
+    vec[positions[positions >= 0] + features["offsets"][block]] = 1.0
+    return vec
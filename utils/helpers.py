@@ -1,10 +1,12 @@
 # utils/helpers.py
 
 from pathlib import Path
-import re
 from typing import Optional
 import pandas as pd
 
+from .metrics import register_cache, span
+from .text import _normalize_title
+
 
 def basic_rating_stats(merged: pd.DataFrame, matched_df: pd.DataFrame) -> dict:
     """Return simple summary stats for overview cards."""
@@ -24,6 +26,47 @@ def basic_rating_stats(merged: pd.DataFrame, matched_df: pd.DataFrame) -> dict:
         "global_mean": float(global_stats["mean"]),
         "mean_diff": float(diff_stats["mean"]),
     }
+
+
+def year_label(year) -> str:
+    """Release year for display, "?" when unknown."""
+    return "?" if pd.isna(year) else str(int(year))
+
+# project root / missing_posters
+POSTER_DIR = Path(__file__).resolve().parent.parent / "missing_posters"
+
+# poster_dir -> (directory mtime, {normalized stem: path})
+_poster_indexes: dict = {}
+_poster_index_stats = {"hits": 0, "misses": 0}
+register_cache("poster_index", lambda: (_poster_index_stats["hits"], _poster_index_stats["misses"]))
+
+
+def _poster_index(poster_dir: Path = POSTER_DIR) -> dict:
+    """
+    Map normalized file stems to poster paths. The index is built once and
+    rebuilt only when the directory's mtime changes (a file was added,
+    removed or renamed).
+    """
+    try:
+        mtime = poster_dir.stat().st_mtime_ns
+    except OSError:
+        return {}
+
+    cached = _poster_indexes.get(poster_dir)
+    if cached is not None and cached[0] == mtime:
+        _poster_index_stats["hits"] += 1
+        return cached[1]
+    _poster_index_stats["misses"] += 1
+
+    index = {}
+    for path in sorted(poster_dir.iterdir()):
+        if path.is_file():
+            index.setdefault(_normalize_title(path.stem), str(path))
+
+    _poster_indexes[poster_dir] = (mtime, index)
+    return index
+
+
 def find_local_poster(title: str) -> Optional[str]:
     """
     Try to find a local poster image for this title in the `missing_posters` folder.
@@ -31,27 +74,16 @@ def find_local_poster(title: str) -> Optional[str]:
     """
     if not isinstance(title, str) or not title.strip():
         return None
+    return _poster_index().get(_normalize_title(title))
 
-    base_dir = Path(__file__).resolve().parent.parent  # project root
-    poster_dir = base_dir / "missing_posters"
-
-    if not poster_dir.exists():
-        return None
-
-    # normalize title: lowercase, remove punctuation, collapse spaces
-    def normalize(text: str) -> str:
-        t = text.lower()
-        t = re.sub(r"[^\w\s]", "", t)
-        t = re.sub(r"\s+", " ", t).strip()
-        return t
-
-    target = normalize(title)
-
-    for path in poster_dir.iterdir():
-        if not path.is_file():
-            continue
-        stem_norm = normalize(path.stem)
-        if stem_norm == target:
-            return str(path)
 
-    return None
+def find_local_posters(titles, poster_dir: Path = POSTER_DIR) -> list[Optional[str]]:
+    """`find_local_poster` for many titles at once, sharing one index lookup."""
+    with span("posters.lookup") as s:
+        index = _poster_index(poster_dir)
+        found = [
+            index.get(_normalize_title(t)) if isinstance(t, str) and t.strip() else None
+            for t in titles
+        ]
+        s["rows"] = len(found)
+    return found
@@ -1,42 +1,58 @@
 # utils/loader.py
 from typing import Optional
 
-import re
+import threading
+from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from rapidfuzz import process
-import streamlit as st
 
+from .aggregates import DIMENSIONS, entity_totals, stats_from_totals, update_totals
+from .cache import (
+    MemoryCache,
+    file_digest,
+    file_key,
+    load_arrays,
+    load_frames,
+    prune_entries,
+    read_pointer,
+    remove_entry,
+    save_arrays,
+    save_frame_chunks,
+    save_frames,
+    write_pointer,
+)
+from .metrics import span
+from .search import INDEX_ARRAYS, best_matches, build_search_index, index_from_arrays
+from .text import _fix_encoding_column, _normalize_titles
 
-def _fix_encoding(text: str) -> Optional[str]:
-    if not isinstance(text, str):
-        return text
-    return (
-        text.replace("‚Äú", '"')
-            .replace("‚Äù", '"')
-            .replace("‚Äô", "'")
-            .replace("\\s", "'")
-    )
+# bump whenever the prepared frames change shape or meaning,
+# so stale on-disk cache entries are not reused
+PIPELINE_VERSION = "5"
 
 
-def _normalize_title(title: str) -> str:
-    if not isinstance(title, str):
-        return ""
-    t = title.lower().strip()
-    # remove leading a/an/the
-    t = re.sub(r"^(a|an|the)\s+", "", t)
-    # remove punctuation
-    t = re.sub(r"[^\w\s]", "", t)
-    # collapse spaces
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+# narrow dtypes for the cleaned catalog; text columns keep pandas' string dtype
+CATALOG_SCHEMA = {
+    "year": "Int16",
+    "episodes": "Int16",
+    "global_score": "float32",
+    "content_rating": "category",
+    "network": "category",
+    "episode_raw": "category",
+}
+
+# catalogs at least this big are cleaned in chunks of CATALOG_CHUNK_ROWS rows
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+CATALOG_CHUNK_ROWS = 20_000
 
 
 def _fuzzy_match_title(title_clean: str, choices: list[str], threshold: int = 80) -> Optional[str]:
     """Return best fuzzy match from choices, or None if below threshold."""
     if not title_clean:
         return None
+    from rapidfuzz import process  # deferred: only needed when matching
+
     match = process.extractOne(title_clean, choices)
     if match is None:
         return None
@@ -46,24 +62,123 @@ def _fuzzy_match_title(title_clean: str, choices: list[str], threshold: int = 80
     return None
 
 
-@st.cache_data(show_spinner=False)
-def load_and_prepare_data() -> dict:
+def _build_title_index(choices: list[str]) -> dict:
     """
-    Load CSV files, clean them, fuzzy-match titles and
-    return all core DataFrames and stats in a dict.
+    Index the catalog titles once for `_match_titles`:
+    the exact-match set and the choice positions blocked by first token.
     """
-    # ---- paths ----
-    base_dir = Path(__file__).resolve().parent.parent  # project root (Kdrama_analytics)
-    data_dir = base_dir / "data"
+    blocks = defaultdict(list)
+    for i, title in enumerate(choices):
+        if title:
+            blocks[title.split(" ", 1)[0]].append(i)
+
+    return {
+        "choices": choices,
+        "exact": set(choices),
+        "blocks": {tok: np.asarray(idx) for tok, idx in blocks.items()},
+    }
 
-    kaggle_path = data_dir / "kdrama_kaggle_1500.csv"
-    my_ratings_path = data_dir / "my_kdrama_ratings.csv"
 
-    # ---- load ----
-    kdrama = pd.read_csv(kaggle_path)
-    my_ratings = pd.read_csv(my_ratings_path)
+def _best_matches(
+    queries: list[str],
+    choices: list[str],
+    threshold: int,
+    workers: int,
+    chunk_size: int = 512,
+) -> list[Optional[str]]:
+    """Best choice per query (first one on ties, like extractOne), or None."""
+    from rapidfuzz import fuzz, process  # deferred: only needed when matching
+
+    best: list[Optional[str]] = []
+    for start in range(0, len(queries), chunk_size):
+        scores = process.cdist(
+            queries[start:start + chunk_size],
+            choices,
+            scorer=fuzz.WRatio,
+            score_cutoff=threshold,
+            workers=workers,
+        )
+        # below-cutoff scores come back as 0
+        top = scores.argmax(axis=1)
+        hit = scores[np.arange(len(top)), top] > 0
+        best.extend(choices[j] if ok else None for j, ok in zip(top, hit))
+    return best
+
 
-    # ---- clean kaggle columns ----
+def _match_titles(
+    titles_clean: pd.Series,
+    title_index: dict,
+    threshold: int = 80,
+    workers: int = -1,
+    block: bool = False,
+    shortlist: Optional[int] = None,
+) -> pd.Series:
+    """
+    Vectorized `_fuzzy_match_title` for a whole column.
+
+    Exact hits are looked up directly; the remaining unique titles are
+    scored in one batched, multi-threaded `process.cdist` call against the
+    catalog. With `block=True` they are first scored only against catalog
+    titles sharing their first token, and only the leftovers go to the full
+    catalog. That is much cheaper on big catalogs, but a better match
+    outside the block can be missed, so it is off by default.
+
+    With `shortlist` each title is scored only against the `shortlist`
+    catalog titles sharing the most trigrams with it (see `utils.search`),
+    and nothing is scored against the full catalog. Orders of magnitude
+    cheaper on big catalogs; WRatio's best match overall can be missed
+    when it shares few trigrams (e.g. a very short title it contains).
+    """
+    choices = title_index["choices"]
+    exact = title_index["exact"]
+
+    unique_titles = [t for t in titles_clean.dropna().unique() if t]
+    matches = {t: t for t in unique_titles if t in exact}
+    pending = [t for t in unique_titles if t not in matches]
+
+    if shortlist and pending:
+        search_index = title_index.get("search") or build_search_index(choices)
+        for q, m in zip(pending, best_matches(search_index, pending, threshold, shortlist)):
+            if m is not None:
+                matches[q] = m
+        pending = []
+
+    if block and pending:
+        by_token = defaultdict(list)
+        for t in pending:
+            by_token[t.split(" ", 1)[0]].append(t)
+
+        for tok, queries in by_token.items():
+            idx = title_index["blocks"].get(tok)
+            if idx is None:
+                continue
+            block_choices = [choices[i] for i in idx]
+            for q, m in zip(queries, _best_matches(queries, block_choices, threshold, workers)):
+                if m is not None:
+                    matches[q] = m
+        pending = [t for t in pending if t not in matches]
+
+    if pending and choices:
+        for q, m in zip(pending, _best_matches(pending, choices, threshold, workers)):
+            if m is not None:
+                matches[q] = m
+
+    return titles_clean.map(matches.get)
+
+
+def _apply_schema(kdrama: pd.DataFrame, categories: bool = True) -> pd.DataFrame:
+    """Cast to CATALOG_SCHEMA; `categories=False` leaves the category columns as strings."""
+    return kdrama.astype(
+        {
+            col: dtype
+            for col, dtype in CATALOG_SCHEMA.items()
+            if col in kdrama.columns and (categories or dtype != "category")
+        }
+    )
+
+
+def _clean_catalog(kdrama: pd.DataFrame, categories: bool = True) -> pd.DataFrame:
+    """Rename, type and clean the raw Kaggle columns and add `title_clean`."""
     kdrama = kdrama.rename(
         columns={
             "Name": "title",
@@ -97,20 +212,83 @@ def load_and_prepare_data() -> dict:
     # fix encoding
     for col in ["title", "synopsis", "genre", "tags", "cast"]:
         if col in kdrama.columns:
-            kdrama[col] = kdrama[col].apply(_fix_encoding)
+            kdrama[col] = _fix_encoding_column(kdrama[col])
 
-    # ---- normalize titles ----
-    kdrama["title_clean"] = kdrama["title"].apply(_normalize_title)
-    my_ratings["title_clean"] = my_ratings["title"].apply(_normalize_title)
+    kdrama["title_clean"] = _normalize_titles(kdrama["title"])
+    return _apply_schema(kdrama, categories)
 
-    # ---- fuzzy match my titles to kaggle ----
-    kaggle_titles_clean = kdrama["title_clean"].tolist()
-    my_ratings["title_clean_matched"] = my_ratings["title_clean"].apply(
-        lambda x: _fuzzy_match_title(x, kaggle_titles_clean, threshold=80)
-    )
 
-    # ---- merge ----
-    merged = my_ratings.merge(
+def _catalog_chunks(kaggle_path: Path, chunksize: int):
+    """
+    Cleaned catalog, `chunksize` CSV rows at a time. Everything is read as
+    text and category columns stay strings, so every chunk has the same
+    column types whatever values it happens to contain.
+    """
+    for chunk in pd.read_csv(kaggle_path, chunksize=chunksize, dtype=str):
+        yield _clean_catalog(chunk, categories=False)
+
+
+def load_catalog(kaggle_path: Path, chunksize: Optional[int] = None) -> dict:
+    """
+    Catalog stage: parse and clean the Kaggle CSV and index its titles.
+
+    The cleaned frame is cached on disk keyed by the CSV content only, so
+    editing the ratings file never re-parses the catalog. The entry is an
+    Arrow IPC file that is memory-mapped rather than read: every process
+    shares one copy of it in the page cache and a new process opens it
+    without parsing anything.
+
+    With `chunksize` (the default for files over STREAM_MIN_BYTES) the CSV
+    is cleaned chunk by chunk and streamed into the disk cache, so parsing
+    needs memory for one chunk rather than the whole file. The result is
+    the same frame as the in-memory path.
+    """
+    with span("catalog.digest"):
+        key = file_key(kaggle_path, version=PIPELINE_VERSION)
+    with span("catalog.prune_cache") as s:
+        # entries older PIPELINE_VERSIONs left behind (catalogs, features,
+        # search indexes, user data); a scan of the cache dir when nothing is stale
+        s.update(prune_entries(PIPELINE_VERSION))
+    with span("catalog.read_cache"):
+        frames = load_frames(key)
+
+    if frames is None:
+        with span("catalog.parse") as s:
+            if chunksize is None and Path(kaggle_path).stat().st_size >= STREAM_MIN_BYTES:
+                chunksize = CATALOG_CHUNK_ROWS
+            chunks = _catalog_chunks(kaggle_path, chunksize) if chunksize else None
+            if chunks is not None and save_frame_chunks(key, "kdrama", chunks, mapped=True, version=PIPELINE_VERSION):
+                frames = load_frames(key)
+            if frames is None:
+                # small catalog, or the cache is not writable
+                frames = {"kdrama": _clean_catalog(pd.read_csv(kaggle_path))}
+                if save_frames(key, frames, mapped=True, version=PIPELINE_VERSION):
+                    # continue on the mapped copy, like every later process
+                    frames = load_frames(key) or frames
+            s["rows"] = len(frames["kdrama"])
+            s["streamed"] = bool(chunksize)
+
+    with span("catalog.index") as s:
+        # streamed entries store category columns as plain strings
+        kdrama = _apply_schema(frames["kdrama"])
+        title_index = _build_title_index(kdrama["title_clean"].tolist())
+        title_index["search"] = _catalog_search_index(key, title_index["choices"])
+        s["rows"] = len(kdrama)
+    return {"key": key, "kdrama": kdrama, "title_index": title_index}
+
+
+def _catalog_search_index(key: str, choices: list[str]) -> dict:
+    """Trigram index over the catalog titles, kept on disk next to the catalog entry and memory-mapped."""
+    arrays = load_arrays(f"{key}-search")
+    if arrays is None:
+        index = build_search_index(choices)
+        save_arrays(f"{key}-search", {name: index[name] for name in INDEX_ARRAYS}, version=PIPELINE_VERSION)
+        return index
+    return index_from_arrays(choices, arrays)
+
+
+def _merge_with_catalog(my_ratings: pd.DataFrame, kdrama: pd.DataFrame) -> pd.DataFrame:
+    return my_ratings.merge(
         kdrama,
         left_on="title_clean_matched",
         right_on="title_clean",
@@ -118,56 +296,221 @@ def load_and_prepare_data() -> dict:
         suffixes=("_me", "_kaggle"),
     )
 
-    matched_df = merged[merged["global_score"].notna()].copy()
-    unmatched_df = merged[merged["global_score"].isna()].copy()
 
-    # ---- genre & actor exploded tables for stats ----
-    genre_df = matched_df[["title_me", "rating", "global_score", "genre"]].copy()
-    genre_df["genre_list"] = (
-        genre_df["genre"]
-        .fillna("")
-        .str.split(",")
-        .apply(lambda lst: [g.strip() for g in lst if g.strip() != ""])
-    )
-    genre_exploded = genre_df.explode("genre_list")
-
-    genre_stats = (
-        genre_exploded.groupby("genre_list")
-        .agg(
-            my_avg_rating=("rating", "mean"),
-            global_avg_score=("global_score", "mean"),
-            count=("title_me", "count"),
+def _diff_rows(old: pd.DataFrame, new: pd.DataFrame, columns: list[str]) -> tuple:
+    """
+    Compare two rating files row by row (as multisets over `columns`).
+    Returns (rows only in `new`, rows only in `old`).
+    """
+    def row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+        h = pd.util.hash_pandas_object(df[columns], index=False)
+        # number repeated rows so duplicates pair up one-to-one
+        return pd.MultiIndex.from_arrays(
+            [h.to_numpy(), h.groupby(h).cumcount().to_numpy()]
         )
-        .sort_values(["count", "my_avg_rating"], ascending=[False, False])
-    )
 
-    actor_df = matched_df[["title_me", "rating", "global_score", "cast"]].copy()
-    actor_df["actor_list"] = (
-        actor_df["cast"]
-        .fillna("")
-        .str.split(",")
-        .apply(lambda lst: [a.strip() for a in lst if a.strip() != ""])
+    old_keys, new_keys = row_keys(old), row_keys(new)
+    return new[~new_keys.isin(old_keys)], old[~old_keys.isin(new_keys)]
+
+
+def prepare_user_data(catalog: dict, my_ratings: pd.DataFrame, previous: Optional[dict] = None) -> dict:
+    """
+    User stage: match my ratings against the catalog, merge, and aggregate
+    per-entity stats for every analytics dimension (`<dim>_stats` for
+    genre, actor, tag, network and year).
+
+    `previous` is the result of an earlier run against the same catalog.
+    When given, only titles it has not seen are fuzzy-matched, and the
+    entity totals are updated with the added and removed rating rows
+    instead of being recomputed from scratch.
+    """
+    kdrama = catalog["kdrama"]
+    raw_columns = list(my_ratings.columns)
+
+    if previous is not None:
+        prev_ratings = previous["my_ratings"]
+        prev_columns = [c for c in prev_ratings.columns if c not in ("title_clean", "title_clean_matched")]
+        if prev_columns != raw_columns:
+            # the ratings file changed shape, start over
+            previous = None
+
+    # ---- normalize titles ----
+    with span("user.normalize", rows=len(my_ratings)):
+        my_ratings["title_clean"] = _normalize_titles(my_ratings["title"])
+
+    # ---- fuzzy match my titles to kaggle (new titles only) ----
+    matches = {}
+    if previous is not None:
+        memo = previous["match_memo"]
+        matched = memo["title_clean_matched"].astype(object)
+        matches = dict(zip(memo["title_clean"], matched.where(matched.notna(), None)))
+
+    new_titles = pd.Series(
+        [t for t in my_ratings["title_clean"].unique() if t not in matches], dtype=object
     )
-    actor_exploded = actor_df.explode("actor_list")
-
-    actor_stats = (
-        actor_exploded.groupby("actor_list")
-        .agg(
-            my_avg_rating=("rating", "mean"),
-            global_avg_score=("global_score", "mean"),
-            count=("title_me", "count"),
-        )
-        .sort_values(["count", "my_avg_rating"], ascending=[False, False])
+    if len(new_titles):
+        with span("user.match", rows=len(new_titles)):
+            found = _match_titles(new_titles, catalog["title_index"], threshold=80)
+        matches.update(zip(new_titles, found))
+
+    my_ratings["title_clean_matched"] = my_ratings["title_clean"].map(matches.get)
+
+    # ---- merge ----
+    with span("user.merge", rows=len(my_ratings)):
+        merged = _merge_with_catalog(my_ratings, kdrama)
+
+        matched = merged["global_score"].notna()
+        matched_df = merged[matched]
+        unmatched_df = merged[~matched]
+
+    # ---- per-entity totals: genre, actor, tag, network, year ----
+    with span("user.aggregate", incremental=previous is not None) as s:
+        if previous is None:
+            totals = {dim: entity_totals(matched_df, dim) for dim in DIMENSIONS}
+        else:
+            added, removed = _diff_rows(prev_ratings, my_ratings, raw_columns)
+            added = _merge_with_catalog(added, kdrama)
+            removed = _merge_with_catalog(removed, kdrama)
+            added = added[added["global_score"].notna()]
+            removed = removed[removed["global_score"].notna()]
+            totals = {
+                dim: update_totals(previous[f"{dim}_totals"], added, removed, dim) for dim in DIMENSIONS
+            }
+        s["rows"] = len(matched_df)
+
+    memo = pd.DataFrame(
+        {"title_clean": list(matches.keys()), "title_clean_matched": list(matches.values())}
     )
 
     return {
-        "kdrama": kdrama,
         "my_ratings": my_ratings,
         "merged": merged,
         "matched_df": matched_df,
         "unmatched_df": unmatched_df,
-        "genre_stats": genre_stats,
-        "actor_stats": actor_stats,
-        "genre_exploded": genre_exploded,
-        "actor_exploded": actor_exploded,
+        **{f"{dim}_stats": stats_from_totals(t) for dim, t in totals.items()},
+        # state for the next incremental run
+        "match_memo": memo,
+        **{f"{dim}_totals": t for dim, t in totals.items()},
     }
+
+
+def load_user_data(catalog: dict, my_ratings_path: Path) -> dict:
+    """
+    Run (or fetch from the disk cache) the user stage for `my_ratings_path`.
+
+    A cache miss starts from the last run against the same catalog, so
+    adding a rating only matches and aggregates the new row. That run's
+    entry is then deleted: only the latest one per catalog is kept.
+    """
+    ratings_key = file_digest(my_ratings_path, version=PIPELINE_VERSION)
+    key = f"{catalog['key']}-{ratings_key}"
+
+    with span("user.read_cache"):
+        data = load_frames(key)
+    if data is None:
+        with span("user.read_previous"):
+            last_key = read_pointer(catalog["key"])
+            previous = load_frames(last_key) if last_key else None
+        data = prepare_user_data(catalog, pd.read_csv(my_ratings_path), previous)
+        with span("user.write_cache"):
+            if save_frames(key, data, version=PIPELINE_VERSION):
+                write_pointer(catalog["key"], key)
+                if last_key and last_key != key:
+                    remove_entry(last_key)
+
+    data["kdrama"] = catalog["kdrama"]
+    return data
+
+
+def _file_signature(path: Path) -> tuple:
+    """Cheap change detector for the in-process cache keys."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+_catalog_cache = MemoryCache(maxsize=2, name="catalog")
+_user_cache = MemoryCache(maxsize=4, name="user_data")
+# serializes `append_rating` across the app's sessions (threads of one process)
+_append_lock = threading.Lock()
+
+
+def default_data_paths() -> tuple[Path, Path]:
+    """The app's bundled (Kaggle catalog, my ratings) CSV paths."""
+    base_dir = Path(__file__).resolve().parent.parent  # project root (Kdrama_analytics)
+    data_dir = base_dir / "data"
+    return data_dir / "kdrama_kaggle_1500.csv", data_dir / "my_kdrama_ratings.csv"
+
+
+def append_rating(
+    title: str,
+    rating: float,
+    my_ratings_path: Optional[Path] = None,
+    year_watched: str = "",
+    notes: str = "",
+) -> None:
+    """
+    Add one row to the ratings CSV (default: the app's), keeping its line
+    endings. The file is rewritten and renamed into place, so readers never
+    see a half-written row; the caches pick the change up by its signature.
+    Concurrent calls in one process are serialized, so no row is lost.
+    """
+    import csv
+    import io
+    import os
+
+    path = Path(my_ratings_path or default_data_paths()[1])
+    row = io.StringIO()
+    csv.writer(row, lineterminator="").writerow([title, f"{rating:g}", year_watched, notes])
+
+    with _append_lock:
+        raw = path.read_bytes() if path.exists() else b"title,rating,year_watched,notes"
+        bom = "\ufeff" if raw.startswith("\ufeff".encode("utf-8")) else ""
+        content = raw.decode("utf-8-sig")
+        newline = "\r\n" if "\r\n" in content else "\n"
+
+        if content and not content.endswith(("\n", "\r")):
+            content += newline
+        content += row.getvalue() + newline
+
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes((bom + content).encode("utf-8"))
+        os.replace(tmp, path)
+
+
+def cached_catalog(kaggle_path: Optional[Path] = None) -> dict:
+    """`load_catalog`, memoized in process until the CSV changes."""
+    kaggle_path = Path(kaggle_path or default_data_paths()[0])
+    return _catalog_cache.get_or_build(
+        (str(kaggle_path), _file_signature(kaggle_path)),
+        lambda: load_catalog(kaggle_path),
+    )
+
+
+def data_signature(kaggle_path: Optional[Path] = None, my_ratings_path: Optional[Path] = None) -> tuple:
+    """Cache key component that changes whenever either input file does."""
+    default_kaggle, default_ratings = default_data_paths()
+    kaggle_path = Path(kaggle_path or default_kaggle)
+    my_ratings_path = Path(my_ratings_path or default_ratings)
+    return (
+        str(kaggle_path),
+        _file_signature(kaggle_path),
+        str(my_ratings_path),
+        _file_signature(my_ratings_path),
+    )
+
+
+def load_and_prepare_data(kaggle_path: Optional[Path] = None, my_ratings_path: Optional[Path] = None) -> dict:
+    """
+    Load CSV files, clean them, fuzzy-match titles and
+    return all core DataFrames and stats in a dict.
+
+    The catalog and user stages are cached separately (in process and on
+    disk), so editing the ratings file only re-runs the user stage.
+    Defaults to the app's bundled data files.
+    """
+    key = data_signature(kaggle_path, my_ratings_path)
+    catalog = cached_catalog(key[0])
+    return _user_cache.get_or_build(
+        (catalog["key"],) + key[2:],
+        lambda: load_user_data(catalog, Path(key[2])),
+    )
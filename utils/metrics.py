@@ -0,0 +1,155 @@
+# utils/metrics.py
+"""
+Lightweight pipeline instrumentation: timed spans per stage (with row
+counts), cache hit / miss statistics, JSON log lines and a Prometheus
+text export. Standard library only, so every module can use it.
+
+    with span("match_titles") as s:
+        matched = _match_titles(...)
+        s["rows"] = len(matched)
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+logger = logging.getLogger("kdrama.metrics")
+
+_lock = threading.Lock()
+# stage -> {"runs", "seconds_total", "last_seconds", "last_rows", "last_run", "last_end"}
+_stages: dict = {}
+# cache name -> callable returning (hits, misses)
+_caches: dict = {}
+_run_count = {"id": 0}
+# the current run of each thread (Streamlit sessions and service requests
+# run in their own threads): {"id", "label", "started", "stages": {stage: (seconds, rows)}}
+_local = threading.local()
+
+
+def _current_run() -> dict:
+    run = getattr(_local, "run", None)
+    if run is None:
+        run = _local.run = {"id": 0, "label": "", "started": 0.0, "stages": {}}
+    return run
+
+
+def start_run(label: str = "") -> int:
+    """
+    Mark the start of a new run (a page render, a request) in this thread;
+    `last_run` in the same thread reports from here on.
+    """
+    with _lock:
+        _run_count["id"] += 1
+        run_id = _run_count["id"]
+    _local.run = {"id": run_id, "label": label, "started": time.time(), "stages": {}}
+    return run_id
+
+
+@contextmanager
+def span(stage: str, **fields):
+    """
+    Time the enclosed block as `stage`. The yielded dict can be filled in
+    with a "rows" count and other fields for the log line.
+    """
+    info = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        rows = info.get("rows")
+        run = _current_run()
+        run["stages"][stage] = (seconds, rows)
+        with _lock:
+            entry = _stages.setdefault(stage, {"runs": 0, "seconds_total": 0.0})
+            entry["runs"] += 1
+            entry["seconds_total"] += seconds
+            entry["last_seconds"] = seconds
+            entry["last_rows"] = rows
+            entry["last_run"] = run["id"]
+            entry["last_end"] = time.time()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "span", "stage": stage, "seconds": round(seconds, 6), **info}, default=str))
+
+
+def register_cache(name: str, stats: Callable[[], tuple]) -> None:
+    """Report cache `name` in the exports; `stats()` returns (hits, misses)."""
+    with _lock:
+        _caches[name] = stats
+
+
+def cache_stats() -> dict:
+    """{cache name: {"hits": int, "misses": int}} for every registered cache."""
+    with _lock:
+        caches = dict(_caches)
+    return {name: dict(zip(("hits", "misses"), stats())) for name, stats in sorted(caches.items())}
+
+
+def stage_stats() -> dict:
+    """Per-stage totals and the most recent timing, {stage: {...}}."""
+    with _lock:
+        return {stage: dict(entry) for stage, entry in _stages.items()}
+
+
+def last_run() -> dict:
+    """
+    The stages this thread ran since its last `start_run`, slowest first,
+    plus cache stats (process-wide).
+    """
+    run = _current_run()
+    stages = [
+        {"stage": stage, "seconds": seconds, "rows": rows}
+        for stage, (seconds, rows) in list(run["stages"].items())
+    ]
+    stages.sort(key=lambda s: -s["seconds"])
+    return {"run": run["id"], "label": run["label"], "stages": stages, "caches": cache_stats()}
+
+
+def reset() -> None:
+    """Forget all stage timings (registered caches stay)."""
+    with _lock:
+        _stages.clear()
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix: str = "kdrama") -> str:
+    """All metrics in the Prometheus text exposition format."""
+    stages = stage_stats()
+    caches = cache_stats()
+    series = [
+        ("stage_runs_total", "counter", "Times each pipeline stage ran",
+         {s: e["runs"] for s, e in stages.items()}, "stage"),
+        ("stage_seconds_total", "counter", "Total seconds spent in each pipeline stage",
+         {s: e["seconds_total"] for s, e in stages.items()}, "stage"),
+        ("stage_last_seconds", "gauge", "Duration of the most recent run of each stage",
+         {s: e["last_seconds"] for s, e in stages.items()}, "stage"),
+        ("stage_last_rows", "gauge", "Rows handled by the most recent run of each stage",
+         {s: e["last_rows"] for s, e in stages.items() if e["last_rows"] is not None}, "stage"),
+        ("cache_hits_total", "counter", "Cache hits",
+         {c: v["hits"] for c, v in caches.items()}, "cache"),
+        ("cache_misses_total", "counter", "Cache misses",
+         {c: v["misses"] for c, v in caches.items()}, "cache"),
+    ]
+    lines = []
+    for name, kind, doc, values, label in series:
+        lines.append(f"# HELP {prefix}_{name} {doc}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for key, value in sorted(values.items()):
+            lines.append(f'{prefix}_{name}{{{label}="{_label(key)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def enable_json_logs(stream=None, level: int = logging.INFO) -> None:
+    """Write one JSON object per span to `stream` (stderr by default)."""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
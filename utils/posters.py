@@ -0,0 +1,239 @@
+# utils/posters.py
+"""
+Local mirror of the catalog's remote posters (`img_url`).
+
+`mirror_posters` downloads URLs concurrently (asyncio + aiohttp, one
+pooled session, at most `concurrency` requests in flight), checks that
+each response is an image and stores it under its content hash, so the
+same poster behind several URLs is kept once. URLs that fail are recorded
+as broken and skipped on later runs. Pages read the mirror through
+`poster_paths`, which never touches the network itself: posters that are
+not mirrored (yet) are returned as their remote URL, for the browser to
+load as before, unless the mirror found that URL broken.
+
+    python -m utils.posters            # mirror the bundled catalog
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .cache import CACHE_DIR
+from .helpers import POSTER_DIR, find_local_posters
+from .metrics import register_cache, span
+
+MIRROR_DIR = CACHE_DIR / "posters"
+MANIFEST = "manifest.json"
+MAX_BYTES = 10 * 1024 * 1024  # larger responses are not posters
+
+# image format (as detected by Pillow) -> file extension
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+
+# mirror_dir -> (manifest mtime, manifest)
+_manifests: dict = {}
+_stats = {"hits": 0, "misses": 0}
+register_cache("poster_mirror", lambda: (_stats["hits"], _stats["misses"]))
+
+
+def _read_manifest(mirror_dir: Path = MIRROR_DIR) -> dict:
+    """
+    {"files": {url: file name}, "broken": {url: {"error", "status", "checked"}}},
+    re-read only when the manifest file changes.
+    """
+    path = mirror_dir / MANIFEST
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {"files": {}, "broken": {}}
+
+    cached = _manifests.get(mirror_dir)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {"files": {}, "broken": {}}
+    _manifests[mirror_dir] = (mtime, manifest)
+    return manifest
+
+
+def _write_manifest(manifest: dict, mirror_dir: Path) -> None:
+    tmp = mirror_dir / f".{MANIFEST}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp, mirror_dir / MANIFEST)
+
+
+def _image_extension(data: bytes) -> Optional[str]:
+    """File extension for `data` if it is a readable image, else None."""
+    from PIL import Image  # deferred: only needed while mirroring
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()
+            return _EXTENSIONS.get(img.format)
+    except Exception:
+        return None
+
+
+def _store(data: bytes, extension: str, mirror_dir: Path) -> str:
+    """Write `data` under its content hash (once) and return the file name."""
+    name = hashlib.blake2b(data, digest_size=16).hexdigest() + extension
+    target = mirror_dir / name
+    if not target.exists():
+        tmp = mirror_dir / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    return name
+
+
+async def _fetch(session, semaphore, url: str, mirror_dir: Path) -> tuple:
+    """(url, file name, None) for a stored poster, (url, None, problem) otherwise."""
+    import aiohttp
+
+    async with semaphore:
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return url, None, {"error": "http", "status": response.status}
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(1 << 16):
+                    data += chunk
+                    if len(data) > MAX_BYTES:
+                        return url, None, {"error": "too large", "status": response.status}
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return url, None, {"error": type(e).__name__, "status": None}
+
+    # decoding and hashing are CPU work: keep them off the event loop
+    data = bytes(data)
+    extension = await asyncio.to_thread(_image_extension, data)
+    if extension is None:
+        return url, None, {"error": "not an image", "status": 200}
+    return url, await asyncio.to_thread(_store, data, extension, mirror_dir), None
+
+
+async def _fetch_all(urls: list[str], mirror_dir: Path, concurrency: int, timeout: float) -> list[tuple]:
+    import aiohttp  # deferred: only needed while mirroring
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # one pooled session: connections to the same host are reused
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"User-Agent": "kdrama-analytics poster mirror"},
+    ) as session:
+        return await asyncio.gather(*(_fetch(session, semaphore, url, mirror_dir) for url in urls))
+
+
+def mirror_posters(
+    urls,
+    mirror_dir: Path = MIRROR_DIR,
+    concurrency: int = 16,
+    timeout: float = 30.0,
+    retry_broken: bool = False,
+) -> dict:
+    """
+    Download every URL in `urls` that is not mirrored yet (nor recorded as
+    broken, unless `retry_broken`) into `mirror_dir`.
+
+    Returns counts: {"requested", "fetched", "broken", "skipped"}.
+    """
+    urls = list(dict.fromkeys(u.strip() for u in urls if isinstance(u, str) and u.strip()))
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(mirror_dir)
+    files, broken = dict(manifest["files"]), dict(manifest["broken"])
+
+    todo = [
+        u for u in urls
+        if not (u in files and (mirror_dir / files[u]).exists())
+        and (retry_broken or u not in broken)
+    ]
+    with span("posters.mirror", rows=len(todo)) as s:
+        results = asyncio.run(_fetch_all(todo, mirror_dir, concurrency, timeout)) if todo else []
+
+        checked = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        for url, name, problem in results:
+            if name is not None:
+                files[url] = name
+                broken.pop(url, None)
+            else:
+                files.pop(url, None)
+                broken[url] = {**problem, "checked": checked}
+        if results:
+            _write_manifest({"files": files, "broken": broken}, mirror_dir)
+
+        counts = {
+            "requested": len(urls),
+            "fetched": sum(name is not None for _, name, _ in results),
+            "broken": sum(name is None for _, name, _ in results),
+            "skipped": len(urls) - len(todo),
+        }
+        s.update(counts)
+    return counts
+
+
+def mirrored_posters(urls, mirror_dir: Path = MIRROR_DIR) -> list[Optional[str]]:
+    """Local mirror path for each URL, or None if it is not mirrored (no network access)."""
+    files = _read_manifest(mirror_dir)["files"]
+    found = []
+    for url in urls:
+        name = files.get(url.strip()) if isinstance(url, str) else None
+        found.append(str(mirror_dir / name) if name else None)
+    _stats["hits"] += sum(p is not None for p in found)
+    _stats["misses"] += sum(p is None for p in found)
+    return found
+
+
+def poster_paths(
+    titles,
+    urls,
+    poster_dir: Path = POSTER_DIR,
+    mirror_dir: Path = MIRROR_DIR,
+) -> list[Optional[str]]:
+    """
+    Image for each (title, img_url): a poster from `missing_posters/` if
+    there is one (those override the catalog's), else the mirrored copy of
+    the URL, else the URL itself unless the mirror recorded it as broken,
+    else None.
+    """
+    urls = list(urls)
+    local = find_local_posters(titles, poster_dir)
+    mirrored = mirrored_posters(urls, mirror_dir)
+    broken = _read_manifest(mirror_dir)["broken"]
+    remote = [_remote_url(url, broken) for url in urls]
+    return [own or copy or url for own, copy, url in zip(local, mirrored, remote)]
+
+
+def _remote_url(url, broken: dict) -> Optional[str]:
+    if not isinstance(url, str) or not url.strip().startswith(("http://", "https://")):
+        return None
+    url = url.strip()
+    return None if url in broken else url
+
+
+def main(argv=None) -> None:
+    from .loader import cached_catalog
+
+    parser = argparse.ArgumentParser(description="Mirror the catalog's remote posters")
+    parser.add_argument("--catalog", type=Path, default=None, help="Kaggle CSV (default: the bundled one)")
+    parser.add_argument("--out", type=Path, default=MIRROR_DIR)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--retry-broken", action="store_true")
+    args = parser.parse_args(argv)
+
+    urls = cached_catalog(args.catalog)["kdrama"]["img_url"]
+    start = time.perf_counter()
+    counts = mirror_posters(urls, args.out, args.concurrency, args.timeout, args.retry_broken)
+    print(json.dumps({**counts, "seconds": round(time.perf_counter() - start, 2)}))
+
+
+if __name__ == "__main__":
+    main()
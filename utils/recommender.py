@@ -1,11 +1,46 @@
 # utils/recommender.py
 
-from typing import Tuple, List
+from functools import lru_cache
+from typing import Optional, Tuple, List
 
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-from .loader import load_and_prepare_data
+from .cache import MemoryCache, load_arrays, save_arrays
+from .aggregates import entity_totals, mean_values, score_values
+from .features import build_feature_matrix, favorite_vector, feature_arrays, features_from_arrays
+from .metrics import register_cache, span
+from .loader import (
+    PIPELINE_VERSION,
+    _match_titles,
+    _merge_with_catalog,
+    cached_catalog,
+    data_signature,
+    load_and_prepare_data,
+)
+from .text import _normalize_titles
+
+# catalog columns carried into candidate / recommendation frames
+CANDIDATE_COLUMNS = ["title", "title_clean", "year", "global_score", "genre", "cast", "img_url"]
+
+# reco_score = sum of weight * component column; any weights can be applied
+# to a scored candidate frame without re-scoring it (see `weighted_scores`)
+SCORE_COMPONENTS = {
+    "global": "global_score_norm",
+    "genre": "genre_overlap",
+    "actor": "actor_overlap",
+    "cf": "cf_score_norm",  # only after `collab.blend_scores`
+}
+DEFAULT_WEIGHTS = {"global": 0.5, "genre": 0.3, "actor": 0.2}
+
+# diversity re-ranking picks from this many best-scored candidates, comparing
+# shows by the feature blocks below (see `_mmr_positions`)
+DIVERSITY_POOL = 300
+DIVERSITY_BLOCKS = ["genre", "actor"]
+
+# per-catalog engines (features, similarity index) and per-data-files results
+_engine_cache = MemoryCache(maxsize=4, name="engine")
+_result_cache = MemoryCache(maxsize=8, name="results")
 
 
 def _get_favorite_genres_and_actors(
@@ -27,87 +62,470 @@ def _get_favorite_genres_and_actors(
     return fav_genres.index.tolist(), fav_actors.index.tolist()
 
 
-def _ensure_lists(df: pd.DataFrame) -> pd.DataFrame:
-    """Ensure genre_list and actor_list columns exist on kdrama df."""
-    if "genre_list" not in df.columns:
-        df["genre_list"] = (
-            df["genre"]
-            .fillna("")
-            .str.split(",")
-            .apply(lambda lst: [g.strip() for g in lst if g.strip() != ""])
-        )
-    if "actor_list" not in df.columns:
-        df["actor_list"] = (
-            df["cast"]
-            .fillna("")
-            .str.split(",")
-            .apply(lambda lst: [a.strip() for a in lst if a.strip() != ""])
-        )
-    return df
+def _catalog_features(catalog: dict) -> dict:
+    """
+    The catalog's feature matrix, kept on disk next to the catalog entry
+    and memory-mapped from there. Catalogs without a key are encoded in
+    memory only.
+    """
+    if catalog.get("key") is None:
+        return build_feature_matrix(catalog["kdrama"])
+
+    key = f"{catalog['key']}-features"
+    arrays = load_arrays(key)
+    if arrays is None:
+        features = build_feature_matrix(catalog["kdrama"])
+        save_arrays(key, feature_arrays(features), version=PIPELINE_VERSION)
+        return features
+    return features_from_arrays(arrays)
+
+
+def build_engine(catalog: dict) -> dict:
+    """
+    Everything user-independent that scoring needs, built once per catalog:
+    the catalog frame (shared, not copied), its sparse feature matrix and
+    the row positions of every title.
+    """
+    kdrama = catalog["kdrama"]
+    with span("engine.build", rows=len(kdrama)):
+        return {
+            "catalog": catalog,
+            "kdrama": kdrama,
+            "features": _catalog_features(catalog),
+            # hashed lazily, on the first lookup
+            "title_positions": pd.Index(kdrama["title_clean"]),
+        }
+
+
+def cached_engine(kaggle_path=None) -> dict:
+    """`build_engine` for the (default) catalog, memoized in process."""
+    catalog = cached_catalog(kaggle_path)
+    return _engine_cache.get_or_build(("engine", catalog["key"]), lambda: build_engine(catalog))
+
+
+def score_candidates(
+    engine: dict,
+    watched_titles_clean,
+    favorite_genres: list[str],
+    favorite_actors: list[str],
+) -> pd.DataFrame:
+    """Score every show not in `watched_titles_clean` against one user's favorites."""
+    kdrama = engine["kdrama"]
+    features = engine["features"]
+
+    unwatched = ~kdrama["title_clean"].isin(watched_titles_clean)
+    candidates = kdrama.loc[unwatched, CANDIDATE_COLUMNS]
+
+    # one sparse product gives both overlap counts for every candidate
+    favorites = np.column_stack(
+        [
+            favorite_vector(features, "genre", favorite_genres),
+            favorite_vector(features, "actor", favorite_actors),
+        ]
+    )
+    overlap = features["matrix"][unwatched.to_numpy()] @ favorites
 
+    genre_overlap = overlap[:, 0].astype("int64")
+    actor_overlap = overlap[:, 1].astype("int64")
 
-def _count_overlap(values, fav_set) -> int:
-    return sum(1 for v in values if v in fav_set)
+    # normalize global score
+    global_score_norm = score_values(candidates["global_score"]).to_numpy() / 10.0
 
+    candidates = candidates.assign(
+        genre_overlap=genre_overlap,
+        actor_overlap=actor_overlap,
+        global_score_norm=global_score_norm,
+    )
+    return candidates.assign(reco_score=weighted_scores(candidates, DEFAULT_WEIGHTS))
 
-@st.cache_data(show_spinner=False)
-def build_recommendation_table() -> tuple[pd.DataFrame, list[str], list[str]]:
+
+def weighted_scores(candidates: pd.DataFrame, weights: dict) -> np.ndarray:
+    """
+    reco_score of every candidate under `weights` ({component: weight}, see
+    SCORE_COMPONENTS). One vectorized pass per component, added in the
+    order given, so DEFAULT_WEIGHTS reproduces the stored reco_score exactly.
+    """
+    scores = np.zeros(len(candidates))
+    for component, weight in weights.items():
+        scores += candidates[SCORE_COMPONENTS[component]].to_numpy(dtype=float) * weight
+    return scores
+
+
+def build_recommendation_table(
+    kaggle_path=None,
+    my_ratings_path=None,
+    min_genre_count: int = 3,
+    min_actor_count: int = 2,
+    min_avg_rating: float = 9.0,
+) -> tuple[pd.DataFrame, list[str], list[str]]:
     """
     Return:
-      - candidates DataFrame with reco_score
+      - candidates DataFrame with reco_score and its components
       - favorite_genre_list
       - favorite_actor_list
+
+    The thresholds pick the favorites (see `_get_favorite_genres_and_actors`).
+    Defaults to the app's data files; memoized per thresholds until either
+    file changes. Weights are not part of the key: re-rank the table with
+    `top_recommendations(..., weights=...)`.
     """
-    data = load_and_prepare_data()
-    kdrama = data["kdrama"].copy()
-    my_ratings = data["my_ratings"].copy()
-    genre_stats = data["genre_stats"]
-    actor_stats = data["actor_stats"]
+    key = data_signature(kaggle_path, my_ratings_path)
+    thresholds = (min_genre_count, min_actor_count, min_avg_rating)
+
+    def build():
+        data = load_and_prepare_data(key[0], key[2])
+
+        # get favorite genres & actors
+        favorite_genres, favorite_actors = _get_favorite_genres_and_actors(
+            data["genre_stats"], data["actor_stats"], *thresholds
+        )
+
+        # build candidate pool = shows I haven't rated yet
+        engine = cached_engine(key[0])
+        with span("reco.score") as s:
+            watched_titles_clean = data["my_ratings"]["title_clean_matched"].dropna().unique()
+            candidates = score_candidates(engine, watched_titles_clean, favorite_genres, favorite_actors)
+            s["rows"] = len(candidates)
+        return candidates, favorite_genres, favorite_actors
+
+    return _result_cache.get_or_build(("table",) + key + thresholds, build)
+
 
-    # get favorite genres & actors
-    favorite_genres, favorite_actors = _get_favorite_genres_and_actors(
-        genre_stats, actor_stats
+def _favorites_by_user(
+    matched: pd.DataFrame,
+    dimension: str,
+    min_count: int,
+    min_avg_rating: float = 9.0,
+) -> pd.Series:
+    """
+    Favorite genres / actors of many users from one per-(user, entity)
+    aggregation. Same rule and order as `_get_favorite_genres_and_actors`.
+    """
+    totals = entity_totals(matched, dimension, by="user_id")
+    stats = (
+        pd.DataFrame(
+            {
+                "my_avg_rating": mean_values(totals, "rating"),
+                "count": totals["count"],
+            }
+        )
+        .reset_index()
+        .sort_values(
+            ["user_id", "count", "my_avg_rating", dimension],
+            ascending=[True, False, False, True],
+        )
     )
+    favorites = stats[(stats["count"] >= min_count) & (stats["my_avg_rating"] >= min_avg_rating)]
+    return favorites.groupby("user_id")[dimension].agg(list)
+
+
+def _favorites_matrix(features: dict, fav_genres: list, fav_actors: list):
+    """(feature columns x 2 * users) CSR indicators: favorite genres, then actors, per user."""
+    from scipy import sparse
+
+    rows, cols = [], []
+    for block, per_user, offset in (("genre", fav_genres, 0), ("actor", fav_actors, 1)):
+        for u, names in enumerate(per_user):
+            positions = features["vocab"][block].get_indexer(names)
+            positions = positions[positions >= 0] + features["offsets"][block]
+            rows.append(positions)
+            cols.append(np.full(len(positions), 2 * u + offset))
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    return sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)),
+        shape=(features["matrix"].shape[1], 2 * len(fav_genres)),
+    )
+
 
-    # build candidate pool = shows I haven't rated yet
-    watched_titles_clean = (
-        my_ratings["title_clean_matched"].dropna().unique()
+def recommend_many(
+    engine: dict,
+    users: dict,
+    top_n: int = 10,
+    chunk_size: int = 256,
+    workers: int = -1,
+    shortlist: Optional[int] = None,
+) -> dict:
+    """
+    Top recommendations for many users in one vectorized pass.
+
+    `users` maps a user id to a DataFrame with `title` and `rating`
+    columns. All titles are matched in one batched call, favorites come
+    from one grouped aggregation, and the overlap counts for a chunk of
+    users come from a single sparse product with the catalog matrix.
+
+    Returns {user_id: {"recommendations": DataFrame, "favorite_genres": [...],
+    "favorite_actors": [...]}}; the ranking matches `build_recommendation_table`
+    + `top_recommendations` for the same ratings. `workers` is the number of
+    threads for title matching (-1: all cores); `shortlist` switches title
+    matching to the trigram shortlist (see `_match_titles`).
+    """
+    user_ids = list(users)
+    if not user_ids:
+        return {}
+
+    catalog = engine["catalog"]
+    kdrama = engine["kdrama"]
+    features = engine["features"]
+
+    frames = [users[u] for u in user_ids]
+    ratings = pd.DataFrame(
+        {
+            "title": np.concatenate([f["title"].to_numpy(dtype=object) for f in frames]),
+            "rating": np.concatenate([f["rating"].to_numpy(dtype=float) for f in frames]),
+            "user_id": np.repeat(np.arange(len(frames)), [len(f) for f in frames]),
+        }
     )
-    kdrama = _ensure_lists(kdrama)
+    with span("reco.many.match", rows=len(ratings)):
+        ratings["title_clean"] = _normalize_titles(ratings["title"])
+        ratings["title_clean_matched"] = _match_titles(
+            ratings["title_clean"], catalog["title_index"], workers=workers, shortlist=shortlist
+        )
+
+    merged = _merge_with_catalog(ratings, catalog["kdrama"])
+    matched = merged[merged["global_score"].notna()]
+    fav_genres = _favorites_by_user(matched, "genre", min_count=3)
+    fav_genres = [fav_genres.get(i, []) for i in range(len(user_ids))]
+    fav_actors = _favorites_by_user(matched, "actor", min_count=2)
+    fav_actors = [fav_actors.get(i, []) for i in range(len(user_ids))]
+
+    watched = ratings.dropna(subset=["title_clean_matched"]).groupby("user_id")["title_clean_matched"].unique()
+    favorites = _favorites_matrix(features, fav_genres, fav_actors)
+    global_norm = score_values(kdrama["global_score"]).to_numpy() / 10.0
+
+    # top positions / scores of every user, turned into frames in one go
+    with span("reco.many.score", rows=len(user_ids)):
+        tops, owners, genre_hits, actor_hits, top_scores = [], [], [], [], []
+        for start in range(0, len(user_ids), chunk_size):
+            stop = min(start + chunk_size, len(user_ids))
+            overlap = (features["matrix"] @ favorites[:, 2 * start:2 * stop]).toarray()
+            genre_overlap, actor_overlap = overlap[:, 0::2], overlap[:, 1::2]
+            scores = (
+                global_norm[:, None] * DEFAULT_WEIGHTS["global"]
+                + genre_overlap * DEFAULT_WEIGHTS["genre"]
+                + actor_overlap * DEFAULT_WEIGHTS["actor"]
+            )
+
+            for j, u in enumerate(range(start, stop)):
+                unwatched = np.ones(len(kdrama), dtype=bool)
+                positions = engine["title_positions"].get_indexer_for(watched.get(u, []))
+                unwatched[positions[positions >= 0]] = False
+                candidates = np.flatnonzero(unwatched)
+                top = candidates[_top_k_positions(scores[candidates, j], top_n)]
+
+                tops.append(top)
+                owners.append(np.full(len(top), u))
+                genre_hits.append(genre_overlap[top, j])
+                actor_hits.append(actor_overlap[top, j])
+                top_scores.append(scores[top, j])
+
+    top = np.concatenate(tops)
+    owners = np.concatenate(owners)
+    recos = kdrama.iloc[top][CANDIDATE_COLUMNS]
+
+    profiles = [(frozenset(g), frozenset(a)) for g, a in zip(fav_genres, fav_actors)]
+    recos = recos.assign(
+        genre_overlap=np.concatenate(genre_hits).astype("int64"),
+        actor_overlap=np.concatenate(actor_hits).astype("int64"),
+        global_score_norm=global_norm[top],
+        reco_score=np.concatenate(top_scores),
+        why_recommended=[
+            _cached_explanation(title, genre, cast, score, *profiles[u])
+            for title, genre, cast, score, u in zip(
+                recos["title_clean"], recos["genre"], recos["cast"], recos["global_score"], owners
+            )
+        ],
+    )
+
+    bounds = np.cumsum([len(t) for t in tops])[:-1]
+    return {
+        user_ids[u]: {
+            "recommendations": recos.iloc[lo:hi],
+            "favorite_genres": fav_genres[u],
+            "favorite_actors": fav_actors[u],
+        }
+        for u, lo, hi in zip(range(len(user_ids)), np.r_[0, bounds], np.r_[bounds, len(recos)])
+    }
+
+
+def recommend(engine: dict, user_ratings: pd.DataFrame, top_n: int = 10) -> dict:
+    """`recommend_many` for a single user's (title, rating) frame."""
+    return recommend_many(engine, {0: user_ratings}, top_n)[0]
 
-    candidates = kdrama[~kdrama["title_clean"].isin(watched_titles_clean)].copy()
 
-    fav_genre_set = set(favorite_genres)
-    fav_actor_set = set(favorite_actors)
+def content_similarity_engine() -> dict:
+    """Synopsis / tag / genre similarity engine over the whole catalog, built once per process."""
+    from .similarity import build_similarity_engine
 
-    candidates["genre_overlap"] = candidates["genre_list"].apply(
-        lambda lst: _count_overlap(lst, fav_genre_set)
+    catalog = cached_catalog()
+    return _engine_cache.get_or_build(
+        ("similarity", catalog["key"]), lambda: build_similarity_engine(catalog["kdrama"])
     )
-    candidates["actor_overlap"] = candidates["actor_list"].apply(
-        lambda lst: _count_overlap(lst, fav_actor_set)
+
+
+def collaborative_scores() -> Optional[pd.Series]:
+    """
+    My predicted rating for every show from the trained collaborative model
+    (see `utils.collab`), or None if no model has been trained yet.
+    """
+    from .collab import MODEL_PATH, load_model, score_ratings
+
+    try:
+        mtime = MODEL_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    def build():
+        model = load_model(MODEL_PATH)
+        if model is None:
+            return None
+        rated = load_and_prepare_data()["my_ratings"].dropna(subset=["title_clean_matched", "rating"])
+        return score_ratings(model, rated["title_clean_matched"], rated["rating"])
+
+    return _result_cache.get_or_build(("collab", mtime) + data_signature(), build)
+
+
+def _top_k_positions(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first, without a full sort.
+    Ties keep their original order and NaN scores rank last.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth)
+    at_cut = np.flatnonzero(scores == kth)[: k - len(above)]
+    top = np.concatenate([above, at_cut])
+    return top[np.lexsort((top, -scores[top]))]
+
+
+def _similarity_vectors(features: dict, rows: np.ndarray):
+    """
+    The DIVERSITY_BLOCKS columns of feature `rows`, each row scaled to unit
+    length, so a sparse dot product of two rows is their cosine similarity.
+    """
+    columns = np.concatenate(
+        [features["offsets"][b] + np.arange(len(features["vocab"][b])) for b in DIVERSITY_BLOCKS]
     )
+    vectors = features["matrix"][rows][:, columns].tocsr()
+    vectors.data = np.minimum(vectors.data, 1.0)  # multi-hot: repeated names count once
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return vectors.multiply(1.0 / norms[:, None]).tocsr()
 
-    # normalize global score
-    candidates["global_score_norm"] = candidates["global_score"] / 10.0
 
-    candidates["reco_score"] = (
-        candidates["global_score_norm"] * 0.5
-        + candidates["genre_overlap"] * 0.3
-        + candidates["actor_overlap"] * 0.2
+def _mmr_positions(scores: np.ndarray, vectors, k: int, diversity: float) -> np.ndarray:
+    """
+    Greedy maximal marginal relevance over a pool sorted best first: each
+    pick maximizes (1 - diversity) * relevance - diversity * (highest
+    similarity to a show already picked). Relevance is the score rescaled
+    to 0-1 over the pool (missing scores count as 0), similarity is cosine over `vectors`' rows.
+
+    Only the similarities to the latest pick are computed (one sparse
+    product per pick), so it costs O(k * pool) time and O(pool) memory,
+    never a pool x pool matrix. Ties keep pool order, so diversity 0
+    returns the pool's first k positions.
+    """
+    k = min(k, len(scores))
+    known = scores[~np.isnan(scores)]
+    low, high = known.min(initial=0.0), known.max(initial=0.0)
+    relevance = (scores - low) / (high - low) if high > low else np.ones(len(scores))
+    relevance = np.nan_to_num(relevance, nan=0.0)
+    max_similarity = np.zeros(len(scores))
+    available = np.ones(len(scores), dtype=bool)
+
+    picked = []
+    for _ in range(k):
+        gain = np.where(available, (1.0 - diversity) * relevance - diversity * max_similarity, -np.inf)
+        best = int(np.argmax(gain))
+        picked.append(best)
+        available[best] = False
+        similarity = (vectors @ vectors[best].T).toarray().ravel()
+        np.maximum(max_similarity, similarity, out=max_similarity)
+    return np.array(picked, dtype=np.int64)
+
+
+@lru_cache(maxsize=4096)
+def _cached_explanation(
+    title_clean: str,
+    genre: str,
+    cast: str,
+    global_score: float,
+    fav_genres: frozenset,
+    fav_actors: frozenset,
+) -> str:
+    row = {
+        "genre_list": _split_list_field(genre),
+        "actor_list": _split_list_field(cast),
+        "global_score": global_score,
+    }
+    return " • ".join(
+        explain_recommendation(row, user_top_genres=fav_genres, user_top_actors=fav_actors)
     )
 
-    candidates["why_recommended"] = candidates.apply(
-        lambda r: " • ".join(
-            explain_recommendation(
-                r,
-                user_top_genres=favorite_genres,
-                user_top_actors=favorite_actors
+
+register_cache("explanations", lambda: _cached_explanation.cache_info()[:2])
+
+
+def top_recommendations(
+    candidates: pd.DataFrame,
+    top_n: int,
+    favorite_genres: list[str],
+    favorite_actors: list[str],
+    weights: Optional[dict] = None,
+    diversity: float = 0.0,
+    engine: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Return the `top_n` best candidates by reco_score with a `why_recommended`
+    column. Only the returned rows are explained, and explanations are
+    memoized per (title, favorites) so changing `top_n` reuses them.
+
+    With `weights` the candidates are re-ranked by `weighted_scores` instead
+    (the returned rows carry the re-weighted reco_score): one pass over the
+    component columns plus a partial top-k, no re-scoring.
+
+    With `diversity` (0-1) the list is picked from the DIVERSITY_POOL best
+    candidates by `_mmr_positions`, trading score for shows unlike the ones
+    already listed by genre and cast. Needs the `engine` the candidates
+    were scored with, for its feature matrix.
+    """
+    with span("reco.top_n", rows=len(candidates)):
+        if weights is None:
+            scores = candidates["reco_score"].to_numpy(dtype=float)
+        else:
+            scores = weighted_scores(candidates, weights)
+        if diversity > 0:
+            if engine is None:
+                raise ValueError("diversity re-ranking needs the engine the candidates were scored with")
+            pool = _top_k_positions(scores, max(DIVERSITY_POOL, top_n))
+            rows = engine["kdrama"].index.get_indexer(candidates.index[pool])
+            vectors = _similarity_vectors(engine["features"], rows)
+            positions = pool[_mmr_positions(scores[pool], vectors, top_n, diversity)]
+        else:
+            positions = _top_k_positions(scores, top_n)
+        top = candidates.iloc[positions]
+        if weights is not None:
+            top = top.assign(reco_score=scores[positions])
+        return _with_explanations(top, favorite_genres, favorite_actors)
+
+
+def _with_explanations(top: pd.DataFrame, favorite_genres: list[str], favorite_actors: list[str]) -> pd.DataFrame:
+    fav_genres = frozenset(favorite_genres)
+    fav_actors = frozenset(favorite_actors)
+    return top.assign(
+        why_recommended=[
+            _cached_explanation(title, genre, cast, score, fav_genres, fav_actors)
+            for title, genre, cast, score in zip(
+                top["title_clean"], top["genre"], top["cast"], top["global_score"]
             )
-        ),
-        axis=1
+        ]
     )
 
-    return candidates, favorite_genres, favorite_actors
 
 def _split_list_field(val) -> list[str]:
     """
@@ -134,8 +552,8 @@ def _top_n_as_set(items: list[str], n: int = 5) -> set[str]:
 
 def explain_recommendation(
     show_row,
-    user_top_genres: list[str],
-    user_top_actors: list[str],
+    user_top_genres: list[str] | set[str],
+    user_top_actors: list[str] | set[str],
     *,
     max_reasons: int = 3,
     min_global_score: float = 8.5
@@ -145,13 +563,17 @@ def explain_recommendation(
     show_genres = show_row.get("genre_list", []) or []
     show_actors = show_row.get("actor_list", []) or []
 
+    # accept precomputed sets, build them once otherwise
+    fav_genres = user_top_genres if isinstance(user_top_genres, (set, frozenset)) else set(user_top_genres)
+    fav_actors = user_top_actors if isinstance(user_top_actors, (set, frozenset)) else set(user_top_actors)
+
     # Genre alignment
-    matched_genres = [g for g in show_genres if g in set(user_top_genres)]
+    matched_genres = [g for g in show_genres if g in fav_genres]
     if matched_genres:
         reasons.append(f"Matches your favorite genres: {', '.join(matched_genres[:2])}")
 
     # Actor affinity
-    matched_actors = [a for a in show_actors if a in set(user_top_actors)]
+    matched_actors = [a for a in show_actors if a in fav_actors]
     if matched_actors:
         reasons.append(f"Features actors you rate highly: {', '.join(matched_actors[:2])}")
 
@@ -0,0 +1,199 @@
+# utils/search.py
+"""
+Title search over the catalog: an inverted trigram index with rapidfuzz
+applied only to a shortlist.
+
+Every text is padded ("  crash landing on you ") and cut into character
+trigrams. The index maps each trigram to the sorted positions of the
+texts containing it (CSR postings), so a query only visits the postings
+of its own trigrams. Candidates are ranked by trigram overlap, and the
+best `shortlist` of them are scored with WRatio, the matcher's scorer.
+
+    index = build_search_index(catalog["title_index"]["choices"])
+    search(index, "crash landng")     # [(position, score), ...]
+    autocomplete(index, "crash l")
+"""
+
+import bisect
+from typing import Optional
+
+import numpy as np
+
+from .text import _normalize_title
+
+SHORTLIST = 64  # candidates scored with rapidfuzz per query
+# share of the query's trigrams a `search` hit must contain: WRatio alone
+# rates short or common-word titles highly ("crash landng" -> "island")
+MIN_OVERLAP = 0.45
+
+# arrays of an index, as stored by `save_arrays`
+INDEX_ARRAYS = ["grams", "indptr", "postings", "gram_counts", "order"]
+
+
+def _gram_codes(texts: list[str], pad_end: bool = True, pad_start: bool = True) -> tuple:
+    """
+    (trigram codes, owner position) for every trigram of every text: three
+    21-bit code points packed into one uint64, so grams compare as integers.
+    """
+    padded = [("  " if pad_start else "") + t + (" " if pad_end else "") for t in texts]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    counts = np.maximum(lengths - 2, 0)
+    if not counts.sum():
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    points = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    starts = np.cumsum(lengths) - lengths
+    owner = np.repeat(np.arange(len(texts)), counts)
+    first = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    codes = (points[first] << np.uint64(42)) | (points[first + 1] << np.uint64(21)) | points[first + 2]
+    return codes, owner
+
+
+def build_search_index(titles: list[str]) -> dict:
+    """
+    Trigram index over `titles` (normalized like `title_clean`); positions
+    in results refer to this list. Built with a few array sorts, no
+    per-title Python work beyond padding.
+    """
+    codes, owner = _gram_codes(titles)
+    # one posting per (gram, title), sorted by gram then title
+    order = np.lexsort((owner, codes))
+    codes, owner = codes[order], owner[order]
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (owner[1:] != owner[:-1])
+    codes, owner = codes[keep], owner[keep]
+
+    grams, starts = np.unique(codes, return_index=True)
+    return {
+        "titles": titles,
+        "grams": grams,
+        "indptr": np.append(starts, len(codes)).astype(np.int64),
+        "postings": owner.astype(np.int32),
+        "gram_counts": np.bincount(owner, minlength=len(titles)).astype(np.int32),
+        # positions in title order, for prefix lookups
+        "order": np.argsort(np.asarray(titles, dtype=object), kind="stable").astype(np.int32),
+    }
+
+
+def index_from_arrays(titles: list[str], arrays: dict) -> dict:
+    """A `build_search_index` result from its stored arrays (see INDEX_ARRAYS)."""
+    return {"titles": titles, **{name: arrays[name] for name in INDEX_ARRAYS}}
+
+
+def _candidates(index: dict, query: str, pad_end: bool = True, pad_start: bool = True) -> tuple:
+    """(positions, shared trigram count, query trigram count) of titles sharing a trigram with `query`."""
+    codes = np.unique(_gram_codes([query], pad_end, pad_start)[0])
+    grams = index["grams"]
+    at = np.searchsorted(grams, codes)
+    known = at < len(grams)
+    known[known] = grams[at[known]] == codes[known]
+    at = at[known]
+    if not len(at):
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64), len(codes)
+
+    indptr, postings = index["indptr"], index["postings"]
+    hits = np.concatenate([postings[indptr[i]:indptr[i + 1]] for i in at])
+    positions, shared = np.unique(hits, return_counts=True)
+    return positions, shared, len(codes)
+
+
+def _shortlist(
+    index: dict,
+    query: str,
+    size: int,
+    pad_end: bool = True,
+    min_overlap: float = 0.0,
+    ranked: bool = False,
+) -> np.ndarray:
+    """
+    Up to `size` positions with the highest trigram similarity to `query`
+    (Dice coefficient, or containment of the query for prefixes), among
+    titles containing at least `min_overlap` of the query's trigrams. In
+    catalog order, or most similar first if `ranked`.
+    """
+    positions, shared, n_query = _candidates(index, query, pad_end)
+    if min_overlap:
+        keep = shared >= min_overlap * n_query
+        positions, shared = positions[keep], shared[keep]
+    if pad_end:
+        similarity = 2.0 * shared / (n_query + index["gram_counts"][positions])
+    else:
+        similarity = shared.astype(float)
+    if len(positions) > size:
+        best = np.argpartition(-similarity, size - 1)[:size]
+        positions, similarity = positions[best], similarity[best]
+    if ranked:
+        return positions[np.lexsort((positions, -similarity))]
+    return np.sort(positions)
+
+
+def search(index: dict, query: str, limit: int = 10, threshold: float = 70, shortlist: int = SHORTLIST) -> list[tuple]:
+    """
+    Typo-tolerant title search: [(position, score)] best first, scores
+    0-100 (WRatio) at or above `threshold`, over titles sharing at least
+    MIN_OVERLAP of the query's trigrams. Equal scores go to the closer
+    title by trigrams.
+    """
+    from rapidfuzz import fuzz, process  # deferred: only needed when scoring
+
+    query = _normalize_title(query)
+    if not query:
+        return []
+    positions = _shortlist(index, query, shortlist, min_overlap=MIN_OVERLAP, ranked=True)
+    titles = index["titles"]
+    found = process.extract(
+        query, [titles[i] for i in positions], scorer=fuzz.WRatio, limit=limit, score_cutoff=threshold
+    )
+    return [(int(positions[j]), score) for _, score, j in found]
+
+
+def autocomplete(index: dict, prefix: str, limit: int = 10) -> list[int]:
+    """
+    Positions of titles starting with `prefix` (alphabetical), topped up with
+    titles containing most of its trigrams anywhere. Only the prefix's own
+    trigrams count for the top-up, not the padded ones: those match every
+    title that starts with the same letter, so prefixes of up to two
+    characters get no top-up.
+    """
+    prefix = _normalize_title(prefix)
+    if not prefix:
+        return []
+    titles, order = index["titles"], index["order"]
+    lo = bisect.bisect_left(order, prefix, key=lambda i: titles[i])
+    found = []
+    for i in order[lo:lo + limit]:
+        if not titles[i].startswith(prefix):
+            break
+        found.append(int(i))
+
+    if len(found) < limit:
+        seen = set(found)
+        positions, shared, n_query = _candidates(index, prefix, pad_end=False, pad_start=False)
+        # every trigram, or all but one from three on: a small typo is
+        # tolerated, but a title sharing one common trigram ("ing") is not
+        good = shared >= max(n_query - (n_query >= 3), 1)
+        positions, shared = positions[good], shared[good]
+        ranked = positions[np.lexsort((positions, -shared))]
+        found.extend(int(i) for i in ranked if i not in seen)
+    return found[:limit]
+
+
+def best_matches(
+    index: dict,
+    queries: list[str],
+    threshold: float,
+    shortlist: int = SHORTLIST,
+) -> list[Optional[str]]:
+    """
+    Best title per normalized query (first one on ties, like extractOne
+    over the whole list), or None, scoring only each query's shortlist.
+    """
+    from rapidfuzz import fuzz, process  # deferred: only needed when matching
+
+    titles = index["titles"]
+    best: list[Optional[str]] = []
+    for query in queries:
+        positions = _shortlist(index, query, shortlist)
+        match = process.extractOne(query, [titles[i] for i in positions], scorer=fuzz.WRatio, score_cutoff=threshold)
+        best.append(match[0] if match else None)
+    return best
@@ -0,0 +1,151 @@
+# utils/service.py
+"""
+Headless JSON recommendation service (stdlib only, no Streamlit).
+
+    python -m utils.service --port 8765
+
+    GET  /health
+    GET  /metrics          stage timings and cache hit rates, Prometheus text format
+    POST /recommend        {"ratings": [{"title": ..., "rating": ...}], "top_n": 10}
+    POST /recommend/batch  {"users": {"<user_id>": [{"title": ..., "rating": ...}]}, "top_n": 10}
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from . import metrics
+from .aggregates import score_values
+from .loader import default_data_paths, load_catalog
+from .recommender import build_engine, recommend_many
+
+RESULT_COLUMNS = [
+    "title",
+    "year",
+    "global_score",
+    "genre",
+    "cast",
+    "img_url",
+    "genre_overlap",
+    "actor_overlap",
+    "reco_score",
+    "why_recommended",
+]
+MAX_TOP_N = 100
+
+
+def _ratings_frame(items) -> pd.DataFrame:
+    """Validate a JSON list of {"title", "rating"} objects."""
+    if not isinstance(items, list):
+        raise ValueError("ratings must be a list of {title, rating} objects")
+    frame = pd.DataFrame(items, columns=["title", "rating"])
+    if frame["title"].isna().any():
+        raise ValueError("every rating needs a title")
+    frame["rating"] = pd.to_numeric(frame["rating"], errors="raise")
+    return frame
+
+
+def _top_n(payload: dict) -> int:
+    top_n = int(payload.get("top_n", 10))
+    if not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"top_n must be between 1 and {MAX_TOP_N}")
+    return top_n
+
+
+def _result_json(result: dict) -> dict:
+    recos = result["recommendations"][RESULT_COLUMNS]
+    recos = recos.assign(global_score=score_values(recos["global_score"]))
+    return {
+        "favorite_genres": result["favorite_genres"],
+        "favorite_actors": result["favorite_actors"],
+        # to_json turns NaN into null and numpy scalars into plain numbers
+        "recommendations": json.loads(recos.to_json(orient="records")),
+    }
+
+
+def handle_recommend(engine: dict, payload: dict) -> dict:
+    users = {"user": _ratings_frame(payload.get("ratings"))}
+    return _result_json(recommend_many(engine, users, _top_n(payload))["user"])
+
+
+def handle_batch(engine: dict, payload: dict) -> dict:
+    users = payload.get("users")
+    if not isinstance(users, dict):
+        raise ValueError("users must map user ids to rating lists")
+    frames = {str(uid): _ratings_frame(items) for uid, items in users.items()}
+    results = recommend_many(engine, frames, _top_n(payload))
+    return {"users": {uid: _result_json(res) for uid, res in results.items()}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    engine: dict = {}
+    routes = {"/recommend": handle_recommend, "/recommend/batch": handle_batch}
+
+    def _send(self, status: int, body: dict) -> None:
+        self._send_bytes(status, json.dumps(body).encode(), "application/json")
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "catalog_size": len(self.engine["kdrama"])})
+        elif self.path == "/metrics":
+            self._send_bytes(200, metrics.prometheus_text().encode(), "text/plain; version=0.0.4")
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        route = self.routes.get(self.path)
+        if route is None:
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("request body must be a JSON object")
+            metrics.start_run(self.path)
+            with metrics.span("service" + self.path.replace("/", ".")):
+                body = route(self.engine, payload)
+            self._send(200, body)
+        except (ValueError, TypeError) as exc:
+            self._send(400, {"error": str(exc)})
+
+
+def make_server(engine: dict, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server answering with `engine`; the catalog is loaded once, up front."""
+    handler = type("Handler", (_Handler,), {"engine": engine})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve K-drama recommendations as JSON.")
+    parser.add_argument("--catalog", type=Path, default=default_data_paths()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log-json", action="store_true", help="log one JSON line per pipeline stage to stderr")
+    args = parser.parse_args(argv)
+
+    if args.log_json:
+        metrics.enable_json_logs()
+    engine = build_engine(load_catalog(args.catalog))
+    server = make_server(engine, args.host, args.port)
+    print(f"serving {len(engine['kdrama'])} shows on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
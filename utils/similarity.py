@@ -0,0 +1,205 @@
+# utils/similarity.py
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# very common words that only add noise to synopsis vectors
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have he her his in into is it its
+    of on or she that the their them they this to was who will with after when
+    while where which what about up out one two s
+    """.split()
+)
+
+
+def _document_terms(df: pd.DataFrame) -> pd.Series:
+    """
+    Terms per show: synopsis words plus whole genre and tag names
+    (prefixed, so "genre:thriller" and the word "thriller" stay distinct).
+    """
+    words = (
+        df["synopsis"].fillna("").str.lower().str.findall(r"\w+")
+        .apply(lambda ws: [w for w in ws if w not in _STOPWORDS and len(w) > 1])
+    )
+    genres = df["genre"].fillna("").str.lower().str.split(",")
+    tags = df["tags"].fillna("").str.lower().str.split(",")
+
+    return pd.Series(
+        [
+            w + [f"genre:{g.strip()}" for g in gs if g.strip()] + [f"tag:{t.strip()}" for t in ts if t.strip()]
+            for w, gs, ts in zip(words, genres, tags)
+        ],
+        index=df.index,
+    )
+
+
+def build_content_vectors(
+    df: pd.DataFrame, max_features: int = 20000, min_df: int = 2
+) -> tuple:
+    """
+    TF-IDF vectors over synopsis + tags + genre, L2-normalized rows,
+    as a float32 CSR matrix aligned with `df`. Returns (matrix, vocab).
+    """
+    from scipy import sparse
+
+    terms = _document_terms(df)
+    lengths = terms.str.len().to_numpy(dtype=np.int64)
+    rows = np.repeat(np.arange(len(df)), lengths)
+    codes, vocab = pd.factorize(terms.explode().dropna())
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (rows, codes)),
+        shape=(len(df), len(vocab)),
+    )
+    counts.sum_duplicates()
+
+    # keep terms shared by at least min_df shows, most frequent first
+    doc_freq = np.bincount(counts.indices, minlength=len(vocab))
+    keep = np.flatnonzero(doc_freq >= min_df)
+    keep = keep[np.argsort(-doc_freq[keep], kind="stable")[:max_features]]
+    counts = counts[:, keep]
+    doc_freq = doc_freq[keep]
+
+    # sublinear tf, smoothed idf
+    counts.data = 1.0 + np.log(counts.data)
+    idf = np.log((1.0 + len(df)) / (1.0 + doc_freq)) + 1.0
+    vectors = (counts @ sparse.diags(idf.astype(np.float32))).tocsr()
+
+    norms = np.sqrt(vectors.multiply(vectors).sum(axis=1)).A1
+    norms[norms == 0] = 1.0
+    vectors = sparse.diags((1.0 / norms).astype(np.float32)) @ vectors
+    return vectors.astype(np.float32).tocsr(), pd.Index(vocab[keep])
+
+
+def reduce_vectors(vectors, dim: int = 128, seed: int = 0) -> np.ndarray:
+    """
+    Project sparse TF-IDF rows onto their top `dim` singular directions (LSA)
+    and L2-normalize: a compact dense float32 matrix whose dot products are
+    cosine similarities.
+    """
+    from scipy.sparse.linalg import svds
+
+    dim = max(1, min(dim, min(vectors.shape) - 1))
+    u, s, _ = svds(vectors.astype(np.float64), k=dim, random_state=seed)
+    embedding = (u * s).astype(np.float32)
+
+    norms = np.linalg.norm(embedding, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embedding / norms
+
+
+def _signatures(embedding: np.ndarray, planes: np.ndarray, n_tables: int, n_bits: int) -> np.ndarray:
+    """Random-hyperplane hash codes, one integer per (row, table)."""
+    bits = (embedding @ planes > 0).reshape(-1, n_tables, n_bits)
+    return (bits * (1 << np.arange(n_bits))).sum(axis=2)
+
+
+def build_lsh_index(
+    embedding: np.ndarray,
+    n_tables: int = 16,
+    n_bits: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Random-projection LSH over the rows of `embedding`: every table hashes
+    a row to an n_bits code, and rows sharing a code share a bucket.
+    By default n_bits grows with log2 of the catalog size, which keeps
+    buckets small and queries sub-linear.
+    """
+    if n_bits is None:
+        n_bits = int(np.clip(np.log2(max(len(embedding), 1)) - 4, 6, 16))
+
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((embedding.shape[1], n_tables * n_bits)).astype(np.float32)
+    codes = _signatures(embedding, planes, n_tables, n_bits)
+
+    tables = []
+    for t in range(n_tables):
+        order = np.argsort(codes[:, t], kind="stable")
+        keys, starts = np.unique(codes[order, t], return_index=True)
+        tables.append(dict(zip(keys.tolist(), np.split(order, starts[1:]))))
+
+    return {"planes": planes, "tables": tables, "n_tables": n_tables, "n_bits": n_bits}
+
+
+def _lsh_candidates(index: dict, query: np.ndarray) -> np.ndarray:
+    """Rows in the query's buckets and their 1-bit neighbours (multi-probe)."""
+    n_bits = index["n_bits"]
+    codes = _signatures(query[None, :], index["planes"], index["n_tables"], n_bits)[0]
+    probes = [0] + [1 << b for b in range(n_bits)]
+
+    found = [
+        table[code ^ flip]
+        for table, code in zip(index["tables"], codes.tolist())
+        for flip in probes
+        if code ^ flip in table
+    ]
+    if not found:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(found))
+
+
+def build_similarity_engine(df: pd.DataFrame, dim: int = 128, **index_kwargs) -> dict:
+    """Content embedding plus LSH index for "more like this" queries over `df`."""
+    vectors, vocab = build_content_vectors(df)
+    embedding = reduce_vectors(vectors, dim)
+    return {
+        "embedding": embedding,
+        "vocab": vocab,
+        "index": build_lsh_index(embedding, **index_kwargs),
+    }
+
+
+def _search(engine: dict, query: np.ndarray, k: int, exclude: np.ndarray, exact: bool) -> tuple:
+    embedding = engine["embedding"]
+
+    if exact:
+        positions = np.arange(len(embedding))
+    else:
+        positions = _lsh_candidates(engine["index"], query)
+    positions = positions[~np.isin(positions, exclude)]
+
+    if not exact and len(positions) < k:
+        # too few neighbours in the probed buckets
+        return _search(engine, query, k, exclude, exact=True)
+
+    scores = embedding[positions] @ query
+    best = np.argsort(-scores, kind="stable")[:k]
+    return positions[best], scores[best]
+
+
+def more_like_title(
+    engine: dict, position: int, k: int = 10, exact: bool = False
+) -> tuple:
+    """
+    The `k` shows most similar to the show at row `position`.
+    Returns (positions, cosine scores), best first. `exact=True` skips the
+    LSH index and scans the whole catalog.
+    """
+    query = engine["embedding"][position]
+    return _search(engine, query, k, np.array([position]), exact)
+
+
+def more_like_profile(
+    engine: dict,
+    positions: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    k: int = 10,
+    exact: bool = False,
+) -> tuple:
+    """
+    The `k` shows closest to the (weighted) centroid of the shows at
+    `positions`, e.g. my top-rated dramas. Those shows are excluded.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    if weights is None:
+        weights = np.ones(len(positions))
+
+    centroid = np.asarray(weights, dtype=np.float32) @ engine["embedding"][positions]
+    norm = np.linalg.norm(centroid)
+    if norm > 0:
+        centroid = centroid / norm
+    return _search(engine, centroid, k, positions, exact)
@@ -0,0 +1,117 @@
+# utils/text.py
+
+import re
+from typing import Optional
+
+import pandas as pd
+
+# mojibake sequences left by a bad UTF-8 round trip, and their fixes
+_ENCODING_FIXES = [
+    ("‚Äú", '"'),
+    ("‚Äù", '"'),
+    ("‚Äô", "'"),
+    ("\\s", "'"),
+]
+
+# what Python's `\s` and `str.strip()` treat as whitespace, within ASCII
+_ASCII_SPACE = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+_ASCII_SPACE_CLASS = r"\t\n\x0b\x0c\r\x1c-\x1f "
+
+
+def _fix_encoding(text: str) -> Optional[str]:
+    if not isinstance(text, str):
+        return text
+    for bad, good in _ENCODING_FIXES:
+        text = text.replace(bad, good)
+    return text
+
+
+def _normalize_title(title: str) -> str:
+    if not isinstance(title, str):
+        return ""
+    t = title.lower().strip()
+    # remove leading a/an/the
+    t = re.sub(r"^(a|an|the)\s+", "", t)
+    # remove punctuation
+    t = re.sub(r"[^\w\s]", "", t)
+    # collapse spaces
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+def _arrow_strings(values: pd.Series) -> Optional[pd.Series]:
+    """`values` as a pyarrow-backed string Series, or None if it holds non-strings."""
+    if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+        return None
+    return values.astype("string[pyarrow]")
+
+
+def _restore_dtype(result: pd.Series, values: pd.Series) -> pd.Series:
+    """Cast a string[pyarrow] result back to the dtype (and missing values) of `values`."""
+    if values.dtype == object:
+        # keep the original missing values (not pd.NA) and let pandas infer
+        # the dtype, as `.apply` does
+        return result.astype(object).where(values.notna(), values).infer_objects()
+    return result.astype(values.dtype)
+
+
+def _fix_encoding_column(values: pd.Series) -> pd.Series:
+    """Vectorized `_fix_encoding`: literal replacements, run by pyarrow."""
+    strings = _arrow_strings(values)
+    if strings is None:
+        return values.apply(_fix_encoding)
+    for bad, good in _ENCODING_FIXES:
+        strings = strings.str.replace(bad, good, regex=False)
+    return _restore_dtype(strings, values)
+
+
+def _normalize_ascii(strings: pd.Series) -> pd.Series:
+    """
+    `_normalize_title` for ASCII-only strings as pyarrow (RE2) string ops.
+    RE2's `\\w` / `\\s` are ASCII-only, so the classes are spelled out to
+    match Python's on ASCII input.
+    """
+    space = f"[{_ASCII_SPACE_CLASS}]"
+    return (
+        strings.str.lower()
+        .str.strip(_ASCII_SPACE)
+        .str.replace(f"^(a|an|the){space}+", "", regex=True)
+        .str.replace(f"[^0-9A-Za-z_{_ASCII_SPACE_CLASS}]", "", regex=True)
+        .str.replace(f"{space}+", " ", regex=True)
+        .str.strip(_ASCII_SPACE)
+    )
+
+
+def _normalize_unicode(strings: pd.Series) -> pd.Series:
+    """`_normalize_title` as object-dtype str ops (Python `re`, Unicode classes)."""
+    return (
+        strings.str.lower()
+        .str.strip()
+        .str.replace(r"^(a|an|the)\s+", "", regex=True)
+        .str.replace(r"[^\w\s]", "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Vectorized `_normalize_title`, with identical output. ASCII titles go
+    through pyarrow string kernels; the rest through Python's `re`, whose
+    Unicode word and space classes RE2 does not reproduce exactly.
+    """
+    strings = _arrow_strings(titles)
+    if strings is None:
+        return titles.apply(_normalize_title)
+
+    strings = strings.fillna("")
+    ascii_mask = strings.str.fullmatch(r"[\x00-\x7f]*").to_numpy(dtype=bool)
+
+    result = _normalize_ascii(strings)
+    if not ascii_mask.all():
+        other = _normalize_unicode(strings[~ascii_mask].astype(object))
+        result = result.astype(object)
+        result[~ascii_mask] = other
+    if titles.dtype == object:
+        return result.astype(object).infer_objects()
+    return result.astype(titles.dtype)
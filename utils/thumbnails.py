@@ -0,0 +1,88 @@
+# utils/thumbnails.py
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .cache import CACHE_DIR
+from .metrics import register_cache, span
+
+THUMB_DIR = CACHE_DIR / "thumbs"
+DISPLAY_WIDTH = 300  # px, wide enough for a 5-column poster wall
+
+# (path, size, mtime) -> thumbnail path, so unchanged files are not re-hashed
+_resolved: dict = {}
+_stats = {"hits": 0, "misses": 0}
+register_cache("thumbnails", lambda: (_stats["hits"], _stats["misses"]))
+
+
+def _content_key(path: Path, width: int) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return f"{h.hexdigest()}-{width}"
+
+
+def thumbnail(path, width: int = DISPLAY_WIDTH, thumb_dir: Path = THUMB_DIR) -> Optional[str]:
+    """
+    Return the path of a JPEG copy of image `path` downsized to `width`
+    pixels, creating it on first use. Thumbnails are stored by content hash,
+    so renamed or duplicated posters share one file. Returns None if `path`
+    does not exist, and `path` itself if no thumbnail can be made (an image
+    PIL cannot read, or a read-only cache dir).
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns, width)
+    if memo_key in _resolved:
+        _stats["hits"] += 1
+        return _resolved[memo_key]
+    _stats["misses"] += 1
+
+    target = thumb_dir / f"{_content_key(path, width)}.jpg"
+    if not target.exists():
+        from PIL import Image  # deferred: only needed to create thumbnails
+
+        tmp = thumb_dir / f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            thumb_dir.mkdir(parents=True, exist_ok=True)
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+                img.thumbnail((width, width * 4))
+                img.save(tmp, format="JPEG", quality=85, optimize=True)
+            os.replace(tmp, target)
+        except OSError:
+            # unreadable image or read-only cache dir: fall back to the original
+            tmp.unlink(missing_ok=True)
+            return str(path)
+
+    _resolved[memo_key] = str(target)
+    return str(target)
+
+
+def thumbnails(paths, width: int = DISPLAY_WIDTH, workers: int = 8) -> list[Optional[str]]:
+    """
+    `thumbnail` for many paths, generated in parallel. None entries and
+    remote URLs in `paths` are returned as they are.
+    """
+    paths = list(paths)
+    todo = [p for p in paths if p is not None and not _is_remote(p)]
+    if not todo:
+        return paths
+
+    with span("posters.thumbnails", rows=len(todo)):
+        with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            done = dict(zip(todo, pool.map(lambda p: thumbnail(p, width), todo)))
+    return [done.get(p, p) if p is not None else None for p in paths]
+
+
+def _is_remote(path) -> bool:
+    return isinstance(path, str) and path.startswith(("http://", "https://"))
@@ -1,37 +1,176 @@
 # utils/visuals.py
+"""
+Altair charts for the Analytics page. Binning and aggregation happen here
+in NumPy, and only the columns a chart shows are passed on, so the spec
+Altair serializes (and Streamlit ships to the browser) stays small
+whatever the number of rows. Charts are cached by a hash of their input
+data, and the JSON size of each one is recorded (`payload_sizes`).
+"""
+
+import hashlib
+import json
+import math
 
 import altair as alt
+import numpy as np
 import pandas as pd
 
+from .aggregates import score_values
+from .cache import MemoryCache
+from .metrics import span
+
+MAX_POINTS = 5000  # scatters with more rows are density-binned
+DENSITY_GRID = 60  # cells per axis of a density-binned scatter
+MAX_CHART_BYTES = 1024 * 1024  # point scatters above this are density-binned too
+
+_chart_cache = MemoryCache(maxsize=16, name="charts")
+# chart name -> JSON bytes of its last spec
+_payloads: dict = {}
+
+
+def _data_key(frame: pd.DataFrame) -> str:
+    """Content hash of `frame` (values and column names) for the chart cache."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(map(str, frame.columns)).encode())
+    h.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _payload_bytes(chart) -> int:
+    return len(json.dumps(chart.to_dict()))
+
+
+def payload_sizes() -> dict:
+    """{chart name: JSON bytes of its spec} for the charts built so far."""
+    return dict(_payloads)
+
+
+def _cached_chart(name: str, data: pd.DataFrame, build, *params):
+    """`build(data)`, memoized by chart name, data hash and `params`; records the payload size."""
+
+    def make():
+        with span(f"chart.{name}", rows=len(data)) as s:
+            chart = build(data)
+            s["bytes"] = _payloads[name] = _payload_bytes(chart)
+        return chart
+
+    return _chart_cache.get_or_build((name, _data_key(data)) + params, make)
+
+
+def _nice_bins(lo: float, hi: float, maxbins: int) -> np.ndarray:
+    """Bin edges as Vega-Lite's `bin=alt.Bin(maxbins=...)` would choose them (nice steps of 1, 2, 5 x 10^k)."""
+    span_ = hi - lo
+    if span_ <= 0:
+        return np.array([lo, lo + 1.0])
+    level = math.ceil(math.log10(maxbins))
+    step = 10.0 ** (round(math.log10(span_)) - level)
+    while math.ceil(span_ / step) > maxbins:
+        step *= 10
+    for divide in (5, 2):
+        if span_ / (step / divide) <= maxbins:
+            step /= divide
+
+    precision = 0 if step >= 1 else int(-math.log10(step)) + 1
+    eps = 10.0 ** (-precision - 1)
+    start = math.floor(lo / step + eps) * step
+    if lo < start:
+        start -= step
+    stop = math.ceil(hi / step) * step
+    return start + step * np.arange(round((stop - start) / step) + 1)
+
+
+def histogram_data(values: pd.Series, maxbins: int = 10) -> pd.DataFrame:
+    """Counts per bin of `values` (missing values skipped): bin_start, bin_end, count."""
+    values = pd.to_numeric(values, errors="coerce").dropna().to_numpy(dtype=float)
+    if not len(values):
+        return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+    edges = _nice_bins(values.min(), values.max(), maxbins)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+def density_data(x: np.ndarray, y: np.ndarray, grid: int = DENSITY_GRID) -> pd.DataFrame:
+    """Non-empty cells of a `grid` x `grid` 2D histogram: cell centers and counts."""
+    ok = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[ok], y[ok]
+    if not len(x):
+        return pd.DataFrame({"x": [], "y": [], "count": []})
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=grid)
+    ix, iy = np.nonzero(counts)
+    return pd.DataFrame(
+        {
+            "x": ((x_edges[ix] + x_edges[ix + 1]) / 2).round(3),
+            "y": ((y_edges[iy] + y_edges[iy + 1]) / 2).round(3),
+            "count": counts[ix, iy].astype("int64"),
+        }
+    )
+
 
 def rating_histogram(merged: pd.DataFrame) -> alt.Chart:
-    return (
-        alt.Chart(merged)
-        .mark_bar()
-        .encode(
-            x=alt.X("rating:Q", bin=alt.Bin(maxbins=10), title="My Rating"),
-            y=alt.Y("count():Q", title="Count"),
+    def build(ratings: pd.DataFrame) -> alt.Chart:
+        return (
+            alt.Chart(histogram_data(ratings["rating"], maxbins=10))
+            .mark_bar()
+            .encode(
+                x=alt.X("bin_start:Q", bin="binned", title="My Rating"),
+                x2="bin_end:Q",
+                y=alt.Y("count:Q", title="Count"),
+                tooltip=["bin_start:Q", "bin_end:Q", "count:Q"],
+            )
+            .properties(height=300)
         )
-        .properties(height=300)
-    )
 
+    return _cached_chart("rating_histogram", merged[["rating"]], build)
 
-def rating_vs_global_scatter(matched_df: pd.DataFrame) -> alt.Chart:
-    chart = (
-        alt.Chart(matched_df)
+
+def _scatter_points(points: pd.DataFrame) -> alt.Chart:
+    return (
+        alt.Chart(points)
         .mark_circle(size=70, opacity=0.7)
         .encode(
             x=alt.X("global_score:Q", title="Global Score"),
             y=alt.Y("rating:Q", title="My Rating"),
             tooltip=["title_me", "rating", "global_score"],
         )
-        .properties(height=350)
     )
 
-    line = (
-        alt.Chart(pd.DataFrame({"x": [7, 10], "y": [7, 10]}))
-        .mark_line(strokeDash=[5, 5], color="gray")
-        .encode(x="x:Q", y="y:Q")
+
+def _scatter_density(points: pd.DataFrame) -> alt.Chart:
+    cells = density_data(points["global_score"].to_numpy(dtype=float), points["rating"].to_numpy(dtype=float))
+    return (
+        alt.Chart(cells)
+        .mark_circle(opacity=0.7)
+        .encode(
+            x=alt.X("x:Q", title="Global Score", scale=alt.Scale(zero=False)),
+            y=alt.Y("y:Q", title="My Rating", scale=alt.Scale(zero=False)),
+            size=alt.Size("count:Q", title="Shows"),
+            tooltip=[
+                alt.Tooltip("x:Q", title="Global Score"),
+                alt.Tooltip("y:Q", title="My Rating"),
+                alt.Tooltip("count:Q", title="Shows"),
+            ],
+        )
     )
 
-    return chart + line
+
+def rating_vs_global_scatter(matched_df: pd.DataFrame) -> alt.Chart:
+    """
+    One point per show up to MAX_POINTS rows (and MAX_CHART_BYTES of spec);
+    above that, a density plot of the same data.
+    """
+
+    def build(points: pd.DataFrame) -> alt.Chart:
+        points = points.assign(global_score=score_values(points["global_score"]))
+        chart = _scatter_density(points) if len(points) > MAX_POINTS else _scatter_points(points)
+
+        line = (
+            alt.Chart(pd.DataFrame({"x": [7, 10], "y": [7, 10]}))
+            .mark_line(strokeDash=[5, 5], color="gray")
+            .encode(x="x:Q", y="y:Q")
+        )
+        layered = (chart + line).properties(height=350)
+        if len(points) <= MAX_POINTS and _payload_bytes(layered) > MAX_CHART_BYTES:
+            layered = (_scatter_density(points) + line).properties(height=350)
+        return layered
+
+    return _cached_chart("rating_vs_global", matched_df[["title_me", "rating", "global_score"]], build)